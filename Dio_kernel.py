@@ -0,0 +1,103 @@
+"""
+Shared kernel for the Dio_build scripts.
+
+The Dio_build2 / Dio_build2-2 / Dio_build3 scripts used to carry their own
+copy of compute_coeffs and run the angle loop at import time. They now only
+hold the media parameters and call the batched functions below, which are
+built on the same system matrix as RT_Cal_v2.
+
+Importing this module does not import pyplot; plot_coeffs does so lazily,
+so the kernel can be used and timed headless.
+"""
+
+import numpy as np
+
+from RT_Cal_v2 import COEFFICIENT_KEYS, energy_coefficients, solve_amplitudes
+
+
+def compute_coeffs(theta_inc, rho1, cP1, cS1, rho2, cP2, cS2, backend='solve'):
+    """
+    Given the long-wave incident angle(s) theta_inc (unit: radians) and the
+    parameters of the two media, solve the reflection and transmission
+    amplitude coefficients:
+    - R_P: Long-wave amplitude coefficient generated by incident long-wave reflection
+    - R_S: Shear wave amplitude coefficient generated by incident long-wave reflection
+    - T_P: Long-wave amplitude coefficient generated by transmission
+    - T_S: Shear wave amplitude coefficient generated by transmission
+    All calculations use complex operations and broadcast over theta_inc.
+
+    :return: A tuple (X, theta_P2, theta_S1, theta_S2); X has shape
+             theta_inc.shape + (4,) and holds [R_P, R_S, T_P, T_S].
+    """
+    theta_inc = np.asarray(theta_inc, dtype=float)
+    X, (theta_P2, theta_S1, theta_S2) = solve_amplitudes(
+        theta_inc, rho1, cP1, cS1, rho2, cP2, cS2, backend)
+    return X, theta_P2, theta_S1, theta_S2
+
+
+def energy_coeffs(angles_deg, rho1, cP1, cS1, rho2, cP2, cS2, backend='solve'):
+    """
+    Energy (intensity) coefficients, as plotted by Dio_build2 / Dio_build2-2.
+
+    :param angles_deg: Incident angles (in degrees).
+    :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'.
+    """
+    theta = np.deg2rad(np.asarray(angles_deg, dtype=float))
+    X, theta_P2, theta_S1, theta_S2 = compute_coeffs(theta, rho1, cP1, cS1,
+                                                     rho2, cP2, cS2, backend)
+    return energy_coefficients(X, theta, (theta_P2, theta_S1, theta_S2),
+                               rho1, cP1, cS1, rho2, cP2, cS2)
+
+
+def amplitude_coeffs(angles_deg, rho1, cP1, cS1, rho2, cP2, cS2, backend='solve'):
+    """
+    Scaled amplitude magnitudes, as plotted by Dio_build3.
+
+    |R_P| is returned unscaled; |R_S|, |T_P| and |T_S| are scaled by
+    (rho1/rho2)(cS1/cS2), (rho1/rho2)(cP1/cP2) and (rho1/rho2) respectively.
+    Only the real part of the scaling is kept, as in the original script.
+
+    :param angles_deg: Incident angles (in degrees).
+    :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'.
+    """
+    theta = np.deg2rad(np.asarray(angles_deg, dtype=float))
+    X, _, _, _ = compute_coeffs(theta, rho1, cP1, cS1, rho2, cP2, cS2, backend)
+    magnitude = np.abs(X)
+    scale = (
+        1.0,
+        np.real((rho1/rho2)*(cS1/cS2)),
+        np.real((rho1/rho2)*(cP1/cP2)),
+        np.real(rho1/rho2),
+    )
+    return {key: magnitude[..., k] * scale[k] for k, key in enumerate(COEFFICIENT_KEYS)}
+
+
+def plot_coeffs(angles_deg, coeffs, labels, title, ylim, ylabel="intensity coefficient",
+                grid=True, show=True, save_path=None):
+    """
+    Plot the four coefficient curves in the Dio_build figure style.
+
+    :param coeffs: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'.
+    :param labels: Legend labels in COEFFICIENT_KEYS order.
+    :param show: Call plt.show() (set False for headless runs).
+    :param save_path: If given, save the figure to this path.
+    :return: The matplotlib figure.
+    """
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(6, 5))
+    for key, label in zip(COEFFICIENT_KEYS, labels):
+        plt.plot(angles_deg, coeffs[key], label=label, linewidth=2)
+    plt.xlabel("incident angle (°)", fontsize=14)
+    plt.ylabel(ylabel, fontsize=14)
+    plt.title(title, fontsize=16)
+    plt.legend(fontsize=12)
+    plt.xlim(0, 90)
+    plt.ylim(*ylim)
+    if grid:
+        plt.grid(True)
+    if save_path is not None:
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    return fig
@@ -1,23 +1,99 @@
+import json
+import math
+
+import numpy as np
+
+# 1 Np = 20/ln(10) dB
+DB_PER_NEPER = 20 / math.log(10)
+
+ATTENUATION_MODELS = ('constant_q', 'power_law')
+
+TABLE_KEYS = ('temperature', 'density', 'vp', 'vs')
+
+
 class Material:
     """
     A class representing a material with density, P-wave velocity, and S-wave velocity.
     """
 
-    def __init__(self, name, density, vp, vs):
+    def __init__(self, name, density, vp, vs, alpha_p=0.0, alpha_s=0.0,
+                 attenuation_model='constant_q', exponent=1.0, f_ref=1e6,
+                 density_sigma=0.0, vp_sigma=0.0, vs_sigma=0.0, temperature_table=None,
+                 stiffness=None):
         """
         Initialize the Material object.
 
         :param density: The density of the material (in kg/m^3).
         :param vp: The P-wave velocity (in m/s).
         :param vs: The S-wave velocity (in m/s).
+        :param alpha_p: P-wave attenuation (in dB/(MHz·m)).
+        :param alpha_s: S-wave attenuation (in dB/(MHz·m)).
+        :param attenuation_model: 'constant_q' (attenuation linear in frequency,
+                                  with the matching logarithmic velocity
+                                  dispersion) or 'power_law' (attenuation
+                                  alpha * f_MHz**exponent, no dispersion).
+        :param exponent: Frequency exponent of the power-law model.
+        :param f_ref: Frequency (in Hz) at which vp and vs are measured.
+        :param density_sigma: Standard uncertainty of the density (in kg/m^3).
+        :param vp_sigma: Standard uncertainty of the P-wave velocity (in m/s).
+        :param vs_sigma: Standard uncertainty of the S-wave velocity (in m/s).
+        :param temperature_table: Optional property curves over temperature:
+                                  a dict with an increasing 'temperature'
+                                  list (e.g. in K) and any of 'density',
+                                  'vp', 'vs' sampled at those temperatures.
+        :param stiffness: Optional 6x6 stiffness matrix in Voigt notation
+                          (in Pa) of an anisotropic solid, with x3 normal
+                          to the interface and x1 in the plane of
+                          incidence (see RT_Anisotropic); vp and vs are
+                          then only used by the isotropic kernels.
         """
         self.name = name
         self.density = density
         self.vp = vp
         self.vs = vs
+        # 流体（vs 为 "NA"）：求解器按流体边界条件处理；
+        # vs 仍保留复数占位值，以兼容旧的 4x4 算法
+        self.is_fluid = isinstance(vs, str) and vs == "NA"
         if vs=="NA":
             self.vs= 0.0013+ 0.0013j
 
+        if attenuation_model not in ATTENUATION_MODELS:
+            raise ValueError(f"Unknown attenuation model {attenuation_model!r}, "
+                             f"expected one of {ATTENUATION_MODELS}")
+        self.alpha_p = alpha_p
+        self.alpha_s = alpha_s
+        self.attenuation_model = attenuation_model
+        self.exponent = exponent
+        self.f_ref = f_ref
+        self.density_sigma = density_sigma
+        self.vp_sigma = vp_sigma
+        self.vs_sigma = vs_sigma
+
+        self.temperature_table = None
+        if temperature_table is not None:
+            table = {key: np.asarray(value, dtype=float)
+                     for key, value in temperature_table.items()}
+            temperature = table.get('temperature')
+            if temperature is None or np.any(np.diff(temperature) <= 0):
+                raise ValueError("temperature_table needs a strictly increasing 'temperature'")
+            for key, value in table.items():
+                if key not in TABLE_KEYS:
+                    raise ValueError(f"Unknown temperature_table column {key!r}, "
+                                     f"expected one of {TABLE_KEYS}")
+                if value.shape != temperature.shape:
+                    raise ValueError(f"temperature_table column {key!r} has {value.size} "
+                                     f"values for {temperature.size} temperatures")
+            self.temperature_table = table
+
+        self.stiffness = None
+        if stiffness is not None:
+            C = np.asarray(stiffness, dtype=float)
+            if C.shape != (6, 6) or not np.allclose(C, C.T):
+                raise ValueError("stiffness must be a symmetric 6x6 Voigt matrix")
+            if self.is_fluid:
+                raise ValueError("A fluid (vs == 'NA') cannot have a stiffness matrix")
+            self.stiffness = C
+
     def p_wave_impedance(self):
         """
         Calculate and return the P-wave impedance.
@@ -37,3 +113,132 @@ class Material:
         :return: The S-wave impedance.
         """
         return self.density * self.vs
+
+    def properties_at(self, temperatures):
+        """
+        Density, P-wave and S-wave velocity at the given temperatures.
+
+        Tabulated curves are interpolated linearly (np.interp, clamped to the
+        end values outside the table); properties without a curve keep their
+        constant value. For a fluid vs is the database stand-in value.
+
+        :param temperatures: Temperatures in the unit of the table, any shape.
+        :return: A tuple (density, vp, vs) of arrays with that shape; vs is complex.
+        """
+        T = np.asarray(temperatures, dtype=float)
+        table = self.temperature_table or {}
+
+        def curve(key, constant):
+            if key in table:
+                return np.interp(T, table['temperature'], table[key])
+            return np.full(T.shape, constant)
+
+        density = curve('density', self.density)
+        vp = curve('vp', self.vp)
+        if self.is_fluid:
+            vs = np.full(T.shape, self.vs, dtype=np.complex128)
+        else:
+            vs = curve('vs', self.vs).astype(np.complex128)
+        return density, vp, vs
+
+    def attenuation(self, alpha, frequencies):
+        """
+        Attenuation (in dB/m) at the given frequencies (in Hz).
+
+        :param alpha: alpha_p or alpha_s (in dB/(MHz·m)).
+        """
+        f_mhz = np.asarray(frequencies, dtype=float) / 1e6
+        if self.attenuation_model == 'power_law':
+            return alpha * f_mhz**self.exponent
+        return alpha * f_mhz
+
+    def complex_vp(self, frequencies):
+        """
+        Complex P-wave velocity at the given frequencies (in Hz).
+
+        Follows the sign convention of RT_Cal_v2 (and of the complex stand-in
+        speeds such as 0.0013+0.0013j): c̃ = ω / (ω/c(f) - iα(f)), so
+        attenuating media have Im(c̃) > 0. Use the complex conjugate for the
+        exp(-iωt) convention.
+
+        :return: A complex array with the shape of frequencies.
+        """
+        return self._complex_velocity(self.vp, self.alpha_p, frequencies)
+
+    def complex_vs(self, frequencies):
+        """
+        Complex S-wave velocity at the given frequencies (in Hz).
+
+        For a fluid (vs == "NA") the database stand-in value is returned.
+
+        :return: A complex array with the shape of frequencies.
+        """
+        return self._complex_velocity(self.vs, self.alpha_s, frequencies)
+
+    def _complex_velocity(self, c0, alpha, frequencies):
+        f = np.asarray(frequencies, dtype=float)
+        if alpha == 0 or np.iscomplexobj(c0):
+            return np.full(f.shape, c0, dtype=np.complex128)
+
+        alpha_np = self.attenuation(alpha, f) / DB_PER_NEPER
+        c = np.full(f.shape, float(c0))
+        positive = f > 0
+        if self.attenuation_model == 'constant_q':
+            # Q 由参考频率处的衰减确定：α = π f / (Q c)
+            alpha_ref = self.attenuation(alpha, self.f_ref) / DB_PER_NEPER
+            Q = math.pi * self.f_ref / (alpha_ref * c0)
+            c[positive] = c0 * (1 + np.log(f[positive] / self.f_ref) / (math.pi * Q))
+
+        omega = 2 * math.pi * f
+        result = np.full(f.shape, c0, dtype=np.complex128)
+        result[positive] = omega[positive] / (omega[positive] / c[positive]
+                                              - 1j * alpha_np[positive])
+        return result
+
+
+class Fluid(Material):
+    """
+    A fluid medium (no shear waves), e.g. the water coupling.
+    """
+
+    def __init__(self, name, density, vp, **kwargs):
+        """
+        Initialize the Fluid object.
+
+        :param density: The density of the fluid (in kg/m^3).
+        :param vp: The P-wave (sound) velocity (in m/s).
+        """
+        super().__init__(name, density, vp, "NA", **kwargs)
+
+
+def require_isotropic(what, *materials):
+    """
+    Raise ValueError if a material has a stiffness matrix; for code paths
+    that only use density, vp and vs.
+
+    :param what: Name of the calling function for the message.
+    """
+    for material in materials:
+        if material.stiffness is not None:
+            raise ValueError(f"{what} supports isotropic materials only, "
+                             f"{material.name!r} has a stiffness matrix")
+
+
+def load_materials(path='materials.json'):
+    """
+    Load all materials from the JSON database.
+
+    Optional attenuation fields (alpha_p, alpha_s, attenuation_model,
+    exponent, f_ref), tolerance fields (density_sigma, vp_sigma, vs_sigma)
+    temperature_table and stiffness are passed on when present.
+
+    :param path: Path to the materials JSON file.
+    :return: A list of Material objects in file order.
+    """
+    with open(path, 'r') as file:
+        data = json.load(file)
+    optional = ('alpha_p', 'alpha_s', 'attenuation_model', 'exponent', 'f_ref',
+                'density_sigma', 'vp_sigma', 'vs_sigma', 'temperature_table', 'stiffness')
+    return [Material(mat['name'], mat['density'], mat['vp'], mat['vs'],
+                     **{key: mat[key] for key in optional if key in mat})
+            for mat in data['materials']]
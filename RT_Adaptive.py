@@ -0,0 +1,109 @@
+"""
+Adaptive angle sampling for RT_Cal_v2.
+
+Instead of a uniform grid, the interval is seeded with a coarse grid plus the
+characteristic angles of the interface from RT_Roots.characteristic_roots
+(first and second critical angle, the leaky Rayleigh angle and the
+interface wave where it has a real incidence angle) and then bisected wherever the linear interpolant
+between two samples misses the midpoint value by more than the tolerance.
+All midpoints of one refinement level are evaluated in one batched call.
+"""
+
+import numpy as np
+
+from RT_Cal_v2 import COEFFICIENT_KEYS
+from RT_Roots import characteristic_roots
+
+
+def characteristic_angles(rt_cal):
+    """
+    Breakpoints of the coefficients of an interface (in degrees).
+
+    The critical angles, the leaky Rayleigh angle and the interface-wave
+    angle of RT_Roots.characteristic_roots; angles that do not exist for the
+    pair are left out.
+
+    :param rt_cal: A RT_Cal_v2 instance.
+    :return: A sorted 1-D array of angles.
+    """
+    material1, material2 = rt_cal.material1, rt_cal.material2
+    roots = characteristic_roots(material1.density, material1.vp, complex(material1.vs),
+                                 material2.density, material2.vp, complex(material2.vs),
+                                 material1.is_fluid, material2.is_fluid)
+    # 界面波慢于所有体波，通常没有实入射角
+    ratio = np.real(material1.vp) / roots['interface_velocity']
+    interface = np.degrees(np.arcsin(ratio)) if ratio <= 1 else np.nan
+    angles = np.array([roots['critical_p'], roots['critical_s'], roots['rayleigh'], interface],
+                      dtype=float)
+    return np.sort(angles[np.isfinite(angles)])
+
+
+def adaptive_intensity_sweep(rt_cal, angle_min=0.0, angle_max=90.0, tol=1e-3,
+                             keys=COEFFICIENT_KEYS, n_initial=16,
+                             min_step=1e-3, max_points=20000, backend='solve',
+                             cache=None):
+    """
+    Sample the energy coefficients of rt_cal adaptively over [angle_min, angle_max].
+
+    :param rt_cal: A RT_Cal_v2 instance.
+    :param tol: Absolute tolerance on the linear-interpolation error of the
+                coefficients listed in keys.
+    :param keys: Coefficients used for the error estimate.
+    :param n_initial: Number of points of the initial uniform grid.
+    :param min_step: Intervals narrower than this (in degrees) are not split.
+    :param max_points: Upper bound on the number of kernel evaluations.
+    :param cache: Optional RT_Cache, passed on to calculate_intensity_coef_batch.
+    :return: A tuple (angles, coeffs) with sorted angles (in degrees) and a
+             dict of coefficient arrays sampled at those angles.
+    """
+    def evaluate(angles):
+        coeffs = rt_cal.calculate_intensity_coef_batch(angles, backend=backend, cache=cache)
+        return np.stack([coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+
+    columns = [COEFFICIENT_KEYS.index(key) for key in keys]
+
+    # 初始网格：均匀粗网格 + 区间内的临界角/瑞利角（及其两侧紧邻点）
+    special = characteristic_angles(rt_cal)
+    special = special[(special > angle_min) & (special < angle_max)]
+    seeds = np.concatenate([
+        np.linspace(angle_min, angle_max, n_initial),
+        special, special - min_step, special + min_step,
+    ])
+    angles = np.unique(np.clip(seeds, angle_min, angle_max))
+    values = evaluate(angles)
+
+    all_angles = [angles]
+    all_values = [values]
+    n_evals = angles.size
+
+    left, right = angles[:-1], angles[1:]
+    f_left, f_right = values[:-1], values[1:]
+    while left.size and n_evals < max_points:
+        wide = (right - left) > min_step
+        left, right = left[wide], right[wide]
+        f_left, f_right = f_left[wide], f_right[wide]
+        if not left.size:
+            break
+        if n_evals + left.size > max_points:
+            keep = max_points - n_evals
+            left, right = left[:keep], right[:keep]
+            f_left, f_right = f_left[:keep], f_right[:keep]
+
+        mid = (left + right) / 2
+        f_mid = evaluate(mid)
+        n_evals += mid.size
+        all_angles.append(mid)
+        all_values.append(f_mid)
+
+        error = np.abs(f_mid - (f_left + f_right) / 2)[:, columns].max(axis=-1)
+        bad = error > tol
+        left, right = (np.concatenate([left[bad], mid[bad]]),
+                       np.concatenate([mid[bad], right[bad]]))
+        f_left, f_right = (np.concatenate([f_left[bad], f_mid[bad]]),
+                           np.concatenate([f_mid[bad], f_right[bad]]))
+
+    angles = np.concatenate(all_angles)
+    values = np.concatenate(all_values)
+    order = np.argsort(angles)
+    angles, values = angles[order], values[order]
+    return angles, {key: values[:, k] for k, key in enumerate(COEFFICIENT_KEYS)}
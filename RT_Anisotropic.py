@@ -0,0 +1,237 @@
+"""
+Interfaces with anisotropic solids (Christoffel equation / Stroh formalism).
+
+A solid is described by its 6x6 Voigt stiffness C (Material.stiffness, or
+the isotropic C from vp and vs). x3 is the interface normal (pointing into
+medium 2) and x1 lies in the plane of incidence. For a horizontal slowness p
+the partial waves u = a exp(iω(p x1 + q x3 - t)) follow from the Stroh
+eigenproblem
+
+    q [a; b] = N(p) [a; b],   b = (p Rᵀ + q T) a   (traction / iω),
+
+with Q_ik = C_i1k1, R_ik = C_i1k3, T_ik = C_i3k3. This is the Christoffel
+equation [p² Q + pq (R + Rᵀ) + q² T] a = ρ a written as a linear
+eigenproblem, so all angles are solved by one stacked np.linalg.eig call.
+Waves with Im(q) > 0, or real q and downward energy flux, go down.
+
+The media must be mirror-symmetric about the plane of incidence (e.g.
+transversely isotropic with the symmetry axis in that plane, see
+transversely_isotropic_stiffness and rotate_stiffness); then SH decouples
+and the in-plane problem is 4x4. Fluids keep their single P wave and the
+fluid boundary conditions. The stiffness is elastic (no attenuation);
+like RT_Multilayer the exp(-iωt) convention is used.
+"""
+
+import numpy as np
+
+from RT_Multilayer import (GRAZING_TOL, boundary_system, energy_flux, nonsingular,
+                           partial_wave)
+
+# Voigt 指标：(i, j) -> 0..5，此处只用到 x1、x3
+_VOIGT = ((0, 5, 4), (5, 1, 3), (4, 3, 2))
+# 关于 x1-x3 平面镜像对称时必须为 0 的 Voigt 分量
+_MIRROR_ZERO = ((0, 3), (0, 5), (1, 3), (1, 5), (2, 3), (2, 5), (3, 4), (4, 5))
+
+
+def isotropic_stiffness(density, vp, vs):
+    """
+    Voigt stiffness (in Pa) of an isotropic solid.
+    """
+    mu = density * vs**2
+    lam = density * vp**2 - 2 * mu
+    C = np.zeros((6, 6))
+    C[:3, :3] = lam
+    C[[0, 1, 2], [0, 1, 2]] = lam + 2 * mu
+    C[[3, 4, 5], [3, 4, 5]] = mu
+    return C
+
+
+def transversely_isotropic_stiffness(C11, C13, C33, C44, C66):
+    """
+    Voigt stiffness (in Pa) of a transversely isotropic solid with the
+    symmetry axis along x3 (normal to the interface, e.g. a layered
+    composite with layers parallel to the surface); C12 = C11 - 2 C66.
+    """
+    C = np.zeros((6, 6))
+    C[0, 0] = C[1, 1] = C11
+    C[0, 1] = C[1, 0] = C11 - 2 * C66
+    C[0, 2] = C[2, 0] = C[1, 2] = C[2, 1] = C13
+    C[2, 2] = C33
+    C[3, 3] = C[4, 4] = C44
+    C[5, 5] = C66
+    return C
+
+
+def rotate_stiffness(C, angle):
+    """
+    Rotate a Voigt stiffness about x2 (in the plane of incidence), e.g. to
+    tilt the symmetry axis of a transversely isotropic solid.
+
+    :param angle: Rotation angle (in degrees).
+    """
+    index = np.array([[0, 5, 4], [5, 1, 3], [4, 3, 2]])
+    tensor = np.asarray(C, dtype=float)[index[:, :, None, None], index[None, None, :, :]]
+    c, s = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    a = np.array([[c, 0.0, s], [0.0, 1.0, 0.0], [-s, 0.0, c]])
+    tensor = np.einsum('ip,jq,kr,ls,pqrs->ijkl', a, a, a, a, tensor)
+    pairs = ((0, 0), (1, 1), (2, 2), (1, 2), (0, 2), (0, 1))
+    return np.array([[tensor[i, j, k, l] for k, l in pairs] for i, j in pairs])
+
+
+def stiffness_of(material):
+    """
+    The Voigt stiffness of a solid Material (isotropic if none is given).
+    """
+    if material.stiffness is not None:
+        return material.stiffness
+    return isotropic_stiffness(float(material.density), float(np.real(material.vp)),
+                               float(np.real(material.vs)))
+
+
+def _sagittal(C):
+    # Q、R、T（2x2，指标顺序 x1、x3）
+    C = np.asarray(C, dtype=float)
+    for i, j in _MIRROR_ZERO:
+        if abs(C[i, j]) > 1e-9 * np.abs(C).max():
+            raise ValueError("The stiffness is not mirror-symmetric about the plane of incidence")
+    axes = (0, 2)
+
+    def block(m, n):
+        return np.array([[C[_VOIGT[i][m], _VOIGT[k][n]] for k in axes] for i in axes])
+
+    return block(0, 0), block(0, 2), block(2, 2)
+
+
+def phase_velocities(C, density, theta):
+    """
+    Phase velocities of the quasi-P and quasi-SV waves along the direction
+    at angle theta from x3 (Christoffel equation), any shape of theta.
+
+    :param theta: Propagation angle(s) in radians.
+    :return: A tuple (v_qP, v_qSV) in m/s.
+    """
+    Q, R, T = _sagittal(C)
+    s, c = np.sin(theta)[..., None, None], np.cos(theta)[..., None, None]
+    gamma = Q * s**2 + (R + R.T) * s * c + T * c**2
+    eigenvalues = np.linalg.eigvalsh(gamma) / density
+    return np.sqrt(eigenvalues[..., 1]), np.sqrt(eigenvalues[..., 0])
+
+
+def stroh_partial_waves(C, density, p):
+    """
+    The four in-plane partial waves of a solid for horizontal slownesses p.
+
+    :param p: Horizontal slowness (in s/m), any shape.
+    :return: A tuple (q, V): q of shape p.shape + (4,) and V of shape
+             p.shape + (4, 4) [wave, component] with components
+             [u_1, u_3, -t_33, -t_13] (tractions divided by iω, as in
+             RT_Multilayer). Waves are ordered down qP, down qSV, up qP,
+             up qSV.
+    """
+    Q, R, T = _sagittal(C)
+    p = np.asarray(p, dtype=float)[..., None, None]
+    T_inv = np.linalg.inv(T)
+    N = np.zeros(p.shape[:-2] + (4, 4))
+    N[..., :2, :2] = -p * (T_inv @ R.T)
+    N[..., :2, 2:] = T_inv
+    N[..., 2:, :2] = density * np.eye(2) - p**2 * Q + p**2 * (R @ T_inv @ R.T)
+    N[..., 2:, 2:] = -p * (R @ T_inv)
+    q, vectors = np.linalg.eig(N)
+    a, b = vectors[..., :2, :], vectors[..., 2:, :]
+
+    # 1. 上/下行：衰减波按 Im(q)，传播波按 z 向能流 Re(b·a*)
+    flux = np.real(np.sum(b * np.conj(a), axis=-2))
+    norm = np.linalg.norm(a, axis=-2) * np.linalg.norm(b, axis=-2)
+    evanescent = np.abs(q.imag) > 1e-9 * np.abs(q)
+    score = np.where(evanescent, 2 * np.sign(q.imag), flux / norm)
+
+    # 2. 同一方向内按偏振的纵向程度区分 qP 与 qSV
+    p_row = np.broadcast_to(p[..., 0], q.shape)
+    slowness = np.stack([p_row, q], axis=-2)
+    longitudinal = (np.abs(np.sum(a * slowness, axis=-2))
+                    / (np.linalg.norm(a, axis=-2) * np.linalg.norm(slowness, axis=-2)))
+    down = np.argsort(-score, axis=-1)
+    order = np.take_along_axis(longitudinal, down, axis=-1)
+    swap_down = order[..., 1] > order[..., 0]
+    swap_up = order[..., 3] > order[..., 2]
+    down[swap_down] = down[swap_down][:, [1, 0, 2, 3]]
+    down[swap_up] = down[swap_up][:, [0, 1, 3, 2]]
+
+    q = np.take_along_axis(q, down, axis=-1)
+    a = np.take_along_axis(a, down[..., None, :], axis=-1)
+    b = np.take_along_axis(b, down[..., None, :], axis=-1)
+    V = np.stack([a[..., 0, :], a[..., 1, :], -b[..., 1, :], -b[..., 0, :]], axis=-1)
+    return q, V
+
+
+def anisotropic_interface_coefficients(material1, material2, theta):
+    """
+    Energy coefficients for qP incidence from material1 onto material2.
+
+    Identical media give T_P = 1 and a grazing incident wave normal
+    (|cos θ| <= RT_Multilayer.GRAZING_TOL) gives R_P = 1, as in the
+    isotropic fluid kernel; any remaining singular point is NaN.
+
+    :param theta: Incidence angle(s) of the incident qP wave normal in
+                  radians, any shape.
+    :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S' (quasi-P and
+             quasi-SV waves); modes that do not exist are 0.
+    """
+    theta = np.asarray(theta, dtype=float)
+    fluid1, fluid2 = material1.is_fluid, material2.is_fluid
+    rho1, rho2 = float(material1.density), float(material2.density)
+    coeffs = {key: np.zeros(theta.shape) for key in ('R_P', 'R_S', 'T_P', 'T_S')}
+
+    # 0. 相同介质与掠入射：解析结果
+    if _same_medium(material1, material2):
+        coeffs['T_P'][...] = 1.0
+        return coeffs
+    grazing = np.abs(np.cos(theta)) <= GRAZING_TOL
+    coeffs['R_P'][grazing] = 1.0
+    theta = theta[~grazing]
+
+    if fluid1:
+        vp1 = float(np.real(material1.vp))
+        p = np.sin(theta) / vp1
+    else:
+        C1 = stiffness_of(material1)
+        p = np.sin(theta) / phase_velocities(C1, rho1, theta)[0]
+        vp1 = np.sqrt(C1[2, 2] / rho1)
+
+    # 1. 反射波（介质1上行）与透射波（介质2下行）；流体只有一个 P 波
+    if fluid1:
+        incident = partial_wave(rho1, vp1, 0.0, p, 'P', 1)[0]
+        reflected = [('R_P', partial_wave(rho1, vp1, 0.0, p, 'P', -1)[0])]
+    else:
+        _, V1 = stroh_partial_waves(C1, rho1, p)
+        incident = V1[..., 0, :]
+        reflected = [('R_P', V1[..., 2, :]), ('R_S', V1[..., 3, :])]
+    if fluid2:
+        vp2 = float(np.real(material2.vp))
+        transmitted = [('T_P', partial_wave(rho2, vp2, 0.0, p, 'P', 1)[0])]
+    else:
+        _, V2 = stroh_partial_waves(stiffness_of(material2), rho2, p)
+        transmitted = [('T_P', V2[..., 0, :]), ('T_S', V2[..., 1, :])]
+
+    # 2. 边界条件与 RT_Multilayer 相同；应力行按 ρ1·vp1 归一化
+    scale = np.array([1.0, 1.0, 1 / (rho1 * vp1), 1 / (rho1 * vp1)])
+    columns = [(0, V * scale) for _, V in reflected] + [(1, V * scale) for _, V in transmitted]
+    M, b = boundary_system(fluid1, fluid2, columns, incident * scale)
+    regular = nonsingular(M)
+    X = np.full(b.shape, np.nan, dtype=np.complex128)
+    X[regular] = np.linalg.solve(M[regular], b[regular][..., np.newaxis])[..., 0]
+
+    # 3. 能量系数 = 振幅平方 × 能流比
+    flux_in = energy_flux(incident)
+    for col, (key, V) in enumerate(reflected + transmitted):
+        coeffs[key][~grazing] = np.abs(X[..., col])**2 * np.abs(energy_flux(V)) / flux_in
+    return coeffs
+
+
+def _same_medium(material1, material2):
+    # 两侧为同一介质（密度、刚度或流体声速均相同）时不存在界面
+    if material1.is_fluid != material2.is_fluid or material1.density != material2.density:
+        return False
+    if material1.is_fluid:
+        return material1.vp == material2.vp
+    return np.array_equal(stiffness_of(material1), stiffness_of(material2))
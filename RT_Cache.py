@@ -0,0 +1,110 @@
+"""
+Memoizing cache for RT_Cal_v2 energy coefficients.
+
+Entries are keyed on the six material parameters of the interface (plus
+the stiffness matrices of anisotropic materials), the solver backend and
+the incidence angle quantized to a fixed step, so repeated plots of the same material pair do
+not re-run the physics. The cache is bounded and evicts the
+least recently used entry first.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from RT_Cal_v2 import COEFFICIENT_KEYS
+
+
+class RT_Cache:
+    """
+    A bounded LRU cache of (R_P, R_S, T_P, T_S) energy coefficients.
+    """
+
+    def __init__(self, max_size=100000, angle_quantum=1e-6):
+        """
+        Initialize the cache.
+
+        :param max_size: Maximum number of cached angles (over all material pairs).
+        :param angle_quantum: Angle quantization step (in degrees). Angles that
+                              round to the same step share one entry, and the
+                              coefficients are evaluated at the quantized angle.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.angle_quantum = angle_quantum
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Drop all entries and reset the statistics.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        Return the hit/miss statistics as a dict.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def get_or_compute(self, params, angles_inc, compute):
+        """
+        Look up the coefficients for an angle array, computing only the misses.
+
+        :param params: Hashable tuple of material parameters of the interface.
+        :param angles_inc: Array of incidence angles (in degrees), any shape.
+        :param compute: Callable taking a 1-D array of angles (in degrees) and
+                        returning a dict of coefficient arrays.
+        :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'; each value has
+                 the shape of angles_inc.
+        """
+        angles_inc = np.asarray(angles_inc, dtype=float)
+        steps = np.rint(angles_inc / self.angle_quantum).astype(np.int64)
+        unique_steps, inverse = np.unique(steps, return_inverse=True)
+
+        values = np.empty((unique_steps.size, len(COEFFICIENT_KEYS)))
+        missing = []
+        for i, step in enumerate(unique_steps.tolist()):
+            key = (params, step)
+            entry = self._entries.get(key)
+            if entry is None:
+                missing.append(i)
+            else:
+                self._entries.move_to_end(key)
+                values[i] = entry
+        self.hits += unique_steps.size - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing = np.array(missing)
+            coeffs = compute(unique_steps[missing] * self.angle_quantum)
+            values[missing] = np.stack([coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+            for i in missing.tolist():
+                self._store((params, int(unique_steps[i])), values[i].copy())
+
+        values = values[inverse.reshape(angles_inc.shape)]
+        return {key: values[..., k] for k, key in enumerate(COEFFICIENT_KEYS)}
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,112 @@
+"""
+Forward-mode differentiation for the batched coefficient kernels.
+
+A Dual carries a value array and its gradient with respect to n real
+parameters along an extra trailing axis (value.shape + (n,)). Arithmetic
+follows the chain rule, so a formula written for plain arrays also yields
+its exact derivatives when the parameters are seeded with variable(). A
+gradient of None stands for zero (a constant).
+"""
+
+import numpy as np
+
+
+def _parts(x):
+    if isinstance(x, Dual):
+        return x.value, x.grad
+    return x, None
+
+
+def _scale(grad, factor):
+    if grad is None:
+        return None
+    return grad * np.asarray(factor)[..., np.newaxis]
+
+
+def _add(g1, g2):
+    if g1 is None:
+        return g2
+    if g2 is None:
+        return g1
+    return g1 + g2
+
+
+class Dual:
+    """
+    A value together with its gradient along the trailing axis.
+    """
+
+    __slots__ = ('value', 'grad')
+    # 让 ndarray 与 Dual 的运算交给 Dual 的反向运算符处理
+    __array_ufunc__ = None
+
+    def __init__(self, value, grad=None):
+        self.value = value
+        self.grad = grad
+
+    @classmethod
+    def variable(cls, value, index, n):
+        """
+        Seed parameter number index of n: the gradient is the unit vector.
+        """
+        value = np.asarray(value)
+        grad = np.zeros(value.shape + (n,), dtype=value.dtype if np.iscomplexobj(value) else float)
+        grad[..., index] = 1.0
+        return cls(value, grad)
+
+    def gradient(self, n):
+        """
+        The gradient as an array, with zeros for a constant.
+        """
+        if self.grad is None:
+            return np.zeros(np.shape(self.value) + (n,))
+        return np.broadcast_to(self.grad, np.broadcast_shapes(
+            self.grad.shape, np.shape(self.value) + (n,)))
+
+    def __add__(self, other):
+        v, g = _parts(other)
+        return Dual(self.value + v, _add(self.grad, g))
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Dual(-self.value, None if self.grad is None else -self.grad)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        v, g = _parts(other)
+        return Dual(self.value * v, _add(_scale(self.grad, v), _scale(g, self.value)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        v, g = _parts(other)
+        value = self.value / v
+        return Dual(value, _add(_scale(self.grad, 1 / v), _scale(g, -value / v)))
+
+    def __rtruediv__(self, other):
+        v, g = _parts(other)
+        value = v / self.value
+        return Dual(value, _add(_scale(g, 1 / self.value), _scale(self.grad, -value / self.value)))
+
+    def __pow__(self, k):
+        return Dual(self.value**k, _scale(self.grad, k * self.value**(k - 1)))
+
+    def conj(self):
+        # 参数为实数，共轭与求导可交换
+        return Dual(np.conj(self.value), None if self.grad is None else np.conj(self.grad))
+
+    @property
+    def real(self):
+        return Dual(np.real(self.value), None if self.grad is None else np.real(self.grad))
+
+    def root(self, value):
+        """
+        Square root on the branch given by value (value**2 == self.value).
+        """
+        return Dual(value, _scale(self.grad, 0.5 / value))
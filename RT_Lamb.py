@@ -0,0 +1,207 @@
+"""
+Lamb-wave dispersion curves of free plates.
+
+A plate of thickness d (half thickness h) carries symmetric and
+antisymmetric Lamb modes whose phase velocity c at the frequency-thickness
+product fd are the roots of the Rayleigh–Lamb equations. With
+P = ph, Q = qh, K = kh (k = ω/c, p² = ω²/vp² - k², q² = ω²/vs² - k²,
+ωh = π fd) they are written pole-free as
+
+    D_S = (Q² - K²)² cos P sin(Q)/Q + 4 K² P sin P cos Q,
+    D_A = (Q² - K²)² sin(P)/P cos Q + 4 K² Q sin Q cos P,
+
+which are real for real c whether P and Q are real or imaginary, so every
+root is a sign change along c. The determinant is sampled on the whole
+(fd, c) grid at once, the sign changes are bracketed and all brackets are
+refined together by bisection; the fd grid is split into chunks that run
+on a process pool.
+
+A mode of phase velocity c is excited from a coupling medium (vp_c) at
+the incidence angle arcsin(vp_c / c), the same relation that gives the
+critical angles of RT_Cal_v2.calculate_critical_angles at c = vp and c = vs.
+
+On Windows, call calculate_dispersion from under an
+``if __name__ == '__main__'`` guard, as required by multiprocessing.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Cal_v2 import RT_Cal_v2
+
+FAMILIES = ('symmetric', 'antisymmetric')
+
+
+def _scaled_trig(z):
+    # cos(z)、sin(z) 乘以 exp(-|Im z|)，虚宗量很大时也不溢出
+    plus = np.exp(1j * z - np.abs(z.imag))
+    minus = np.exp(-1j * z - np.abs(z.imag))
+    return (plus + minus) / 2, (plus - minus) / 2j
+
+
+def _sinc(z, sin):
+    # sin(z)/z（sin 已缩放），z = 0 处取 1
+    safe = np.where(z == 0, 1.0, z)
+    return np.where(z == 0, 1.0, sin / safe)
+
+
+def lamb_determinant(fd, c, vp, vs, family='symmetric'):
+    """
+    Real-valued Rayleigh–Lamb determinant D_S or D_A.
+
+    The value is scaled by exp(-|Im P| - |Im Q|), which keeps it finite for
+    evanescent partial waves and does not change its sign.
+
+    :param fd: Frequency-thickness product (in Hz·m).
+    :param c: Phase velocity (in m/s); all arguments broadcast.
+    :param family: 'symmetric' or 'antisymmetric'.
+    :return: A float array with the broadcast shape.
+    """
+    omega_h = np.pi * np.asarray(fd, dtype=float)
+    c = np.asarray(c, dtype=float)
+    K = omega_h / c
+    P = omega_h * np.sqrt(1 / vp**2 - 1 / c**2 + 0j)
+    Q = omega_h * np.sqrt(1 / vs**2 - 1 / c**2 + 0j)
+    cos_P, sin_P = _scaled_trig(P)
+    cos_Q, sin_Q = _scaled_trig(Q)
+    lame = (Q**2 - K**2)**2
+    if family == 'symmetric':
+        value = lame * cos_P * _sinc(Q, sin_Q) + 4 * K**2 * P * sin_P * cos_Q
+    elif family == 'antisymmetric':
+        value = lame * _sinc(P, sin_P) * cos_Q + 4 * K**2 * Q * sin_Q * cos_P
+    else:
+        raise ValueError(f"Unknown family {family!r}, expected one of {FAMILIES}")
+    return np.real(value)
+
+
+def lamb_roots(fd, c_grid, vp, vs, family='symmetric', n_iter=48):
+    """
+    Phase velocities of all modes of one family on the c grid.
+
+    :param fd: 1-D array of F frequency-thickness products (in Hz·m).
+    :param c_grid: 1-D increasing array of trial phase velocities (in m/s);
+                   its spacing must resolve neighbouring modes.
+    :param n_iter: Bisection steps per bracket.
+    :return: An (F, M) array; row i holds the roots at fd[i] in increasing
+             order (mode n in column n where modes do not cross), NaN padded.
+    """
+    fd = np.asarray(fd, dtype=float)
+    c_grid = np.asarray(c_grid, dtype=float)
+
+    # 1. 整个 (fd, c) 网格一次求值，相邻点变号处即为根的区间
+    values = lamb_determinant(fd[:, np.newaxis], c_grid[np.newaxis, :], vp, vs, family)
+    negative = np.signbit(values)
+    row, col = np.nonzero(negative[:, :-1] != negative[:, 1:])
+
+    # 2. 所有区间一起二分
+    lo, hi = c_grid[col], c_grid[col + 1]
+    lo_negative = negative[row, col]
+    for _ in range(n_iter):
+        mid = (lo + hi) / 2
+        same = np.signbit(lamb_determinant(fd[row], mid, vp, vs, family)) == lo_negative
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+
+    # 3. 每个 fd 的根按相速度排列，不足处补 NaN
+    counts = np.bincount(row, minlength=fd.size)
+    roots = np.full((fd.size, max(counts.max(initial=0), 1)), np.nan)
+    rank = np.arange(row.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    roots[row, rank] = (lo + hi) / 2
+    return roots
+
+
+def _lamb_chunk(task):
+    # 一段 fd 的两类模态（在工作进程中运行）
+    start, fd, c_grid, vp, vs, n_iter = task
+    return start, [lamb_roots(fd, c_grid, vp, vs, family, n_iter) for family in FAMILIES]
+
+
+def incidence_angles(phase_velocity, vp_coupling):
+    """
+    Incidence angle that excites a guided wave of the given phase velocity.
+
+    Snell's law sin θ = vp_coupling / c; at c = vp or vs of the plate this
+    is the P- or S-wave critical angle.
+
+    :param phase_velocity: Phase velocity (in m/s), any shape.
+    :param vp_coupling: P-wave velocity of the coupling medium (in m/s).
+    :return: Angles (in degrees); NaN where c < vp_coupling.
+    """
+    ratio = vp_coupling / np.asarray(phase_velocity, dtype=float)
+    with np.errstate(invalid='ignore'):
+        return np.where(ratio <= 1, np.degrees(np.arcsin(np.minimum(ratio, 1.0))), np.nan)
+
+
+class RT_Lamb:
+    """
+    A class for the Lamb-wave dispersion curves of a plate of one material.
+    """
+
+    def __init__(self, material):
+        """
+        Initialize the RT_Lamb object with the plate Material.
+
+        :param material: A solid Material (e.g. aluminium, hastelloy x).
+        """
+        if material.is_fluid:
+            raise ValueError(f"Lamb waves need a solid plate, {material.name!r} is a fluid")
+        require_isotropic('RT_Lamb', material)
+        self.material = material
+        self.vp = float(np.real(material.vp))
+        self.vs = float(np.real(material.vs))
+
+    def calculate_dispersion(self, fd, c_grid=None, n_iter=48, chunk_size=64, n_workers=None):
+        """
+        Phase-velocity dispersion curves of the symmetric and antisymmetric modes.
+
+        :param fd: 1-D array of frequency-thickness products (in Hz·m),
+                   e.g. np.linspace(1e3, 10e3, 500) for 0.01–10 MHz·mm.
+        :param c_grid: Trial phase velocities (in m/s); defaults to 2048
+                       points from 0.1 vs to 4 vp.
+        :param n_iter: Bisection steps per bracket.
+        :param chunk_size: fd values per task.
+        :param n_workers: Worker processes; None uses all cores, 1 runs in
+                          this process.
+        :return: A dict with 'fd' and, for 'symmetric' and 'antisymmetric',
+                 an (F, M) array of phase velocities (see lamb_roots).
+        """
+        fd = np.asarray(fd, dtype=float)
+        if c_grid is None:
+            c_grid = np.linspace(0.1 * self.vs, 4 * self.vp, 2048)
+        tasks = [(start, fd[start:start + chunk_size], c_grid, self.vp, self.vs, n_iter)
+                 for start in range(0, fd.size, chunk_size)]
+        if n_workers == 1:
+            results = list(map(_lamb_chunk, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(_lamb_chunk, tasks))
+
+        dispersion = {'fd': fd}
+        for f, family in enumerate(FAMILIES):
+            n_modes = max(chunk[f].shape[1] for _, chunk in results)
+            roots = np.full((fd.size, n_modes), np.nan)
+            for start, chunk in results:
+                roots[start:start + len(chunk[f]), :chunk[f].shape[1]] = chunk[f]
+            dispersion[family] = roots
+        return dispersion
+
+    def calculate_incidence_angles(self, dispersion, coupling):
+        """
+        Incidence angles in the coupling medium that excite each Lamb mode.
+
+        :param dispersion: The dict returned by calculate_dispersion.
+        :param coupling: The coupling Material (e.g. water).
+        :return: A dict with 'symmetric' and 'antisymmetric' angle arrays
+                 (in degrees, NaN for modes slower than the coupling
+                 medium) and 'critical_p', 'critical_s' from
+                 RT_Cal_v2.calculate_critical_angles; modes with vs < c < vp
+                 are excited between the two critical angles.
+        """
+        vp_coupling = float(np.real(coupling.vp))
+        angles = {family: incidence_angles(dispersion[family], vp_coupling)
+                  for family in FAMILIES}
+        angles['critical_p'], angles['critical_s'] = RT_Cal_v2(
+            coupling, self.material).calculate_critical_angles()
+        return angles
@@ -0,0 +1,201 @@
+"""
+Monte Carlo propagation of material-property uncertainty.
+
+The tolerance fields of a Material (density_sigma, vp_sigma, vs_sigma) are
+taken as independent normal standard uncertainties. They default to 0 and
+the shipped database sets none, so they must be filled in from measured
+tolerances before a run. Samples of both materials are drawn in chunks and
+pushed through RT_Multilayer.interface_coefficients for the whole angle
+grid at once.
+
+Memory stays bounded: a chunk is reduced to per-(angle, coefficient)
+histograms, counts and running sums, minima and maxima before it leaves
+the worker, so the number of samples only costs time. The sums are taken
+of the deviations from the nominal coefficients, so the standard deviation
+does not cancel catastrophically and is exactly 0 without tolerances. Chunks are evaluated
+on a process pool; each chunk draws from its own SeedSequence child, so a
+seeded run gives the same result for any number of workers.
+
+Quantile bands are read off the merged histograms (resolution
+value_range / bins). Values equal to the lower edge of value_range (e.g.
+coefficients of modes that do not propagate, which are exactly 0) are kept
+as an exact atom, and every quantile is clamped to the sample minimum and
+maximum, so constant coefficients come out exact. Values outside
+value_range are not binned but counted; quantiles that fall among them are
+NaN.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Cal_v2 import COEFFICIENT_KEYS
+from RT_Multilayer import interface_coefficients
+from RT_Sweep import MAX_VS_VP_RATIO
+
+
+def _nominal(material):
+    return ((material.density, material.vp, material.vs),
+            (material.density_sigma, material.vp_sigma,
+             0.0 if material.is_fluid else material.vs_sigma))
+
+
+def _monte_carlo_chunk(task):
+    """
+    Histograms, counts and sums of the coefficients for one chunk (runs in a worker).
+    """
+    seed, n, nominal, sigma, fluid, theta_P1, reference, value_range, bins = task
+    rng = np.random.default_rng(seed)
+    samples = np.asarray(nominal) + rng.standard_normal((n, 6)) * np.asarray(sigma, dtype=float)
+    rho1, cP1, cS1, rho2, cP2, cS2 = (samples[:, i, np.newaxis] for i in range(6))
+
+    # 非物理样本（非正值、泊松比 <= -1）直接丢弃
+    valid = (samples[:, [0, 1, 3, 4]].real > 0).all(axis=1)
+    for i, is_fluid in ((2, fluid[0]), (5, fluid[1])):
+        if not is_fluid:
+            vs, vp = samples[:, i].real, samples[:, i - 1].real
+            valid &= (vs > 0) & (vs < MAX_VS_VP_RATIO * vp)
+
+    coeffs = interface_coefficients(theta_P1, rho1[valid].real, cP1[valid].real,
+                                    cS1[valid], rho2[valid].real, cP2[valid].real,
+                                    cS2[valid], *fluid)
+    values = np.stack([coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+    values = values[np.isfinite(values).all(axis=(1, 2))]
+
+    # 下边界上的值（如不传播模态的 0）单独计数；
+    # 超出 value_range 的值只计数不入箱
+    K = theta_P1.size
+    lo, hi = value_range
+    at_lo = values == lo
+    below, above = values < lo, values > hi
+    inside = ~(at_lo | below | above)
+    index = np.minimum(((values[inside] - lo) / (hi - lo) * bins).astype(np.intp), bins - 1)
+    cell = np.broadcast_to(np.arange(K * 4).reshape(K, 4) * bins, values.shape)[inside]
+    histogram = np.bincount(index + cell, minlength=K * 4 * bins)
+    counts = np.stack([below.sum(axis=0), at_lo.sum(axis=0), above.sum(axis=0)])
+    extremes = (values.min(axis=0, initial=np.inf), values.max(axis=0, initial=-np.inf))
+    deviation = values - reference
+    return (histogram.reshape(K, 4, bins), counts, deviation.sum(axis=0),
+            np.square(deviation).sum(axis=0), extremes, len(values))
+
+
+def _histogram_quantiles(histogram, counts, edges, extremes, quantiles):
+    # 由直方图的累积分布线性插值求分位数，histogram 形状 (..., bins)；
+    # 落在下边界原子上的分位数取精确值，落在范围外的为 NaN，
+    # 结果限制在样本最小/最大值之间
+    below, at_lo, above = (c[..., np.newaxis] for c in counts)
+    cdf = np.cumsum(histogram, axis=-1)
+    start = below + at_lo
+    total = start + cdf[..., -1:] + above
+    result = []
+    for q in quantiles:
+        target = q * total
+        j = np.minimum(np.sum(start + cdf < target, axis=-1, keepdims=True),
+                       histogram.shape[-1] - 1)
+        inside = np.take_along_axis(histogram, j, axis=-1)
+        before = start + np.take_along_axis(cdf, j, axis=-1) - inside
+        fraction = np.divide(target - before, inside, out=np.zeros(target.shape),
+                             where=inside > 0)
+        value = np.minimum(edges[j] + fraction * (edges[1] - edges[0]), edges[-1])
+        value = np.where(target <= start, edges[0], value)
+        outside = (((below > 0) & (target <= below)) | ((above > 0) & (target > total - above))
+                   | (total == 0))
+        value = np.clip(value, extremes[0][..., np.newaxis], extremes[1][..., np.newaxis])
+        result.append(np.where(outside, np.nan, value)[..., 0])
+    return np.stack(result)
+
+
+def monte_carlo_bands(material1, material2, angles_inc, n_samples=200000, chunk_size=2000,
+                      quantiles=(0.025, 0.5, 0.975), bins=2400, value_range=(0.0, 1.2),
+                      n_workers=None, seed=None):
+    """
+    Confidence bands of the energy coefficients under material uncertainty.
+
+    :param material1: Incident Material (tolerances from density_sigma etc.).
+    :param material2: Transmission Material.
+    :param angles_inc: 1-D array of K incidence angles (in degrees).
+    :param n_samples: Number of drawn (material1, material2) samples.
+    :param chunk_size: Samples per task; memory per worker grows with
+                       chunk_size * K.
+    :param quantiles: Quantiles of the returned bands.
+    :param bins: Histogram bins over value_range per angle and coefficient.
+    :param value_range: Range of the histograms; values outside it are
+                        counted in 'out_of_range' and not binned.
+    :param n_workers: Worker processes; None uses all cores, 1 runs in
+                      this process.
+    :param seed: Seed for reproducible runs.
+    :return: A dict with 'angles', 'quantiles', 'n_samples' (valid samples)
+             and per coefficient key dicts 'mean', 'std' of shape (K,) and
+             'bands' of shape (len(quantiles), K) (NaN where a quantile
+             lies outside value_range) and 'out_of_range' counts of shape (K,).
+    """
+    require_isotropic('monte_carlo_bands', material1, material2)
+    angles_inc = np.asarray(angles_inc, dtype=float)
+    theta_P1 = np.deg2rad(angles_inc)
+    (nominal1, sigma1), (nominal2, sigma2) = _nominal(material1), _nominal(material2)
+    nominal = np.array(nominal1 + nominal2, dtype=np.complex128)
+    fluid = (material1.is_fluid, material2.is_fluid)
+    # 以名义参数的系数为参考值累加偏差，方差不受相消误差影响
+    exact = interface_coefficients(theta_P1, nominal[0].real, nominal[1].real, nominal[2],
+                                   nominal[3].real, nominal[4].real, nominal[5], *fluid)
+    reference = np.stack([exact[key] for key in COEFFICIENT_KEYS], axis=-1)
+    reference = np.where(np.isfinite(reference), reference, 0.0)
+
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, n, nominal, sigma1 + sigma2, fluid, theta_P1, reference, value_range, bins)
+             for s, n in zip(seeds, sizes)]
+
+    K = angles_inc.size
+    histogram = np.zeros((K, 4, bins), dtype=np.int64)
+    counts = np.zeros((3, K, 4), dtype=np.int64)
+    total = np.zeros((K, 4))
+    total_sq = np.zeros((K, 4))
+    low, high = np.full((K, 4), np.inf), np.full((K, 4), -np.inf)
+    count = 0
+
+    def accumulate(result):
+        nonlocal count
+        h, c, s, s2, (mn, mx), n = result
+        histogram[...] += h
+        counts[...] += c
+        total[...] += s
+        total_sq[...] += s2
+        np.minimum(low, mn, out=low)
+        np.maximum(high, mx, out=high)
+        count += n
+
+    if n_workers == 1:
+        for task in tasks:
+            accumulate(_monte_carlo_chunk(task))
+    else:
+        n_workers = n_workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # 限制同时挂起的任务数，已完成的结果立即归并
+            pending = set()
+            for task in tasks:
+                if len(pending) >= 2 * n_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        accumulate(future.result())
+                pending.add(pool.submit(_monte_carlo_chunk, task))
+            for future in wait(pending).done:
+                accumulate(future.result())
+
+    edges = np.linspace(value_range[0], value_range[1], bins + 1)
+    shift = total / max(count, 1)
+    mean = reference + shift
+    std = np.sqrt(np.maximum(total_sq / max(count, 1) - shift**2, 0.0))
+    bands = _histogram_quantiles(histogram, counts, edges, (low, high), quantiles)
+    return {
+        'angles': angles_inc,
+        'quantiles': tuple(quantiles),
+        'n_samples': count,
+        'mean': {key: mean[:, k] for k, key in enumerate(COEFFICIENT_KEYS)},
+        'std': {key: std[:, k] for k, key in enumerate(COEFFICIENT_KEYS)},
+        'bands': {key: bands[:, :, k] for k, key in enumerate(COEFFICIENT_KEYS)},
+        'out_of_range': {key: counts[0, :, k] + counts[2, :, k]
+                         for k, key in enumerate(COEFFICIENT_KEYS)},
+    }
@@ -0,0 +1,588 @@
+"""
+Multilayer reflection/transmission engine for cryo-UT coupling stacks.
+
+The stack is an incident half-space, any number of layers with thickness and
+a transmission half-space, e.g. water → ice → aluminium. The P-SV problem is
+solved with the global-matrix method (Lowe, 1995): every layer carries its
+down- and up-going partial waves as unknowns, and each partial wave is
+referenced at the interface it travels away from, so all phase factors
+exp(iωq h) have magnitude ≤ 1 and the system stays well conditioned for
+thick or evanescent layers.
+
+Boundary conditions per interface:
+1. solid–solid: u_x, u_z, σ_zz, σ_xz continuous
+2. fluid–solid: u_z, σ_zz continuous, σ_xz = 0 on the solid side
+3. fluid–fluid: u_z, σ_zz continuous
+
+The global matrix is block-banded: interface i only couples the waves of
+media i and i + 1. It is solved by block elimination from the bottom
+interface upwards, which gives the generalised reflection matrix R_i
+(up-going waves above interface i per down-going wave) and transmission
+matrix T_i. Every step is one stacked np.linalg.solve over the whole
+(frequency × angle) map with at most 4 unknowns per point, so the cost
+grows linearly with the number of layers. The recursion uses the same
+phase factors as the global matrix, all of magnitude ≤ 1.
+"""
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Dual import Dual
+
+# 位移/应力向量的分量顺序
+_UX, _UZ, _SZZ, _SXZ = 0, 1, 2, 3
+# 竖向慢度反号（下行 -> 上行）时 P、S 波各分量的符号，列为 P、S
+_REVERSED = np.array([[1, -1], [-1, 1], [1, -1], [-1, 1]])
+
+
+def _vertical_slowness(c, p):
+    # 取 Im(q) >= 0 的分支：下行波向下衰减
+    q = np.sqrt((1.0 / np.asarray(c, dtype=np.complex128))**2 - p**2 + 0j)
+    return np.where(q.imag < 0, -q, q)
+
+
+def _velocities(material, fluid, frequencies):
+    # Material 的复速度采用 Im(c) > 0 的约定，本模块使用 exp(-iωt)，故取共轭
+    f = np.asarray(frequencies, dtype=float)[:, np.newaxis]
+    vp = np.conj(material.complex_vp(f))
+    vs = 0.0 if fluid else np.conj(material.complex_vs(f))
+    return vp, vs
+
+
+def partial_wave(rho, vp, vs, p, kind, direction):
+    """
+    Displacement/stress vector of one partial wave per unit displacement amplitude.
+
+    The stresses are divided by -iω (and the velocities likewise), so the
+    vector [u_x, u_z, σ_zz, σ_xz] depends on frequency only through
+    complex (attenuating) velocities.
+
+    :param vs: S-wave velocity; 0 for a fluid.
+    :return: A tuple (V, q) with V of shape p.shape + (4,) and the signed
+             vertical slowness q.
+    """
+    c = vp if kind == 'P' else vs
+    q = direction * _vertical_slowness(c, p)
+    components = _wave_components(rho, vp, vs, p, q, kind)
+    V = np.stack(np.broadcast_arrays(*components), axis=-1).astype(np.complex128)
+    return V, q
+
+
+def _wave_components(rho, vp, vs, p, q, kind):
+    # [u_x, u_z, -t_zz, -t_xz]；只用四则运算，因此也适用于 Dual
+    mu = rho * vs**2
+    lam = rho * vp**2 - 2 * mu
+    if kind == 'P':
+        d_x, d_z = p * vp, q * vp
+        t_zz = lam / vp + 2 * mu * q * d_z
+    else:
+        d_x, d_z = q * vs, -(p * vs)
+        t_zz = 2 * mu * q * d_z
+    t_xz = mu * (p * d_z + q * d_x)
+    return d_x, d_z, -t_zz, -t_xz
+
+
+def interface_rows(fluid_a, fluid_b):
+    """
+    Boundary conditions of one interface as (component, side) pairs.
+
+    side is None for continuity of the component across the interface, and
+    0 (medium above) or 1 (medium below) for a traction-free condition that
+    involves only that medium.
+    """
+    if fluid_a or fluid_b:
+        rows = [(_UZ, None), (_SZZ, None)]
+        if not fluid_a:
+            rows.append((_SXZ, 0))
+        if not fluid_b:
+            rows.append((_SXZ, 1))
+        return rows
+    return [(c, None) for c in (_UX, _UZ, _SZZ, _SXZ)]
+
+
+def boundary_system(fluid_a, fluid_b, columns, incident):
+    """
+    Boundary-condition system M X = b of a single interface.
+
+    :param columns: List of (side, V) per unknown wave: side 0 (medium
+                    above) or 1 (medium below) and its displacement/stress
+                    vector V (..., 4).
+    :param incident: Displacement/stress vector (..., 4) of the incident
+                     wave in the medium above.
+    :return: A tuple (M (..., n, n), b (..., n)).
+    """
+    rows = interface_rows(fluid_a, fluid_b)
+    shape = np.broadcast_shapes(incident.shape[:-1], *(V.shape[:-1] for _, V in columns))
+    M = np.zeros(shape + (len(rows), len(columns)), dtype=np.complex128)
+    b = np.zeros(shape + (len(rows),), dtype=np.complex128)
+    for r, (comp, side) in enumerate(rows):
+        for col, (m, V) in enumerate(columns):
+            if side is None or side == m:
+                M[..., r, col] = (1.0 if m == 0 else -1.0) * V[..., comp]
+        if side is None or side == 0:
+            b[..., r] = -incident[..., comp]
+    return M, b
+
+
+def energy_flux(V):
+    # 单个平面波的 z 向能流（省略公共因子 ω²/2）：-Re(σ_zz v_z* + σ_xz v_x*)
+    return -np.real(V[..., _SZZ] * np.conj(V[..., _UZ]) + V[..., _SXZ] * np.conj(V[..., _UX]))
+
+
+class RT_Multilayer:
+    """
+    A class for reflection and transmission spectra of a layered stack,
+    for a P wave incident from the top half-space.
+    """
+
+    def __init__(self, top, layers, bottom):
+        """
+        Initialize the stack.
+
+        :param top: Material of the incident half-space.
+        :param layers: List of (Material, thickness) tuples, top to bottom,
+                       thickness in m.
+        :param bottom: Material of the transmission half-space.
+        """
+        require_isotropic('RT_Multilayer', top, bottom, *(m for m, _ in layers))
+        self.top = top
+        self.layers = [(material, float(thickness)) for material, thickness in layers]
+        self.bottom = bottom
+
+    def _media(self):
+        media = [(self.top, None)] + self.layers + [(self.bottom, None)]
+        return [(material, thickness, material.is_fluid) for material, thickness in media]
+
+    def calculate_spectra(self, frequencies, angles_inc):
+        """
+        Energy reflection/transmission coefficients over frequency and angle.
+
+        :param frequencies: 1-D array of F frequencies (in Hz); attenuating
+                            materials are evaluated with their complex
+                            velocities at each frequency.
+        :param angles_inc: 1-D array of K incidence angles in the top medium (in degrees).
+        :return: A dict with (F, K) arrays: energy coefficients 'R_P', 'R_S'
+                 (top half-space) and 'T_P', 'T_S' (bottom half-space), and
+                 the complex displacement amplitudes under 'amplitudes'
+                 (a dict with the same keys). Missing modes in fluids are 0.
+        """
+        omega = 2 * np.pi * np.asarray(frequencies, dtype=float)[:, np.newaxis]
+        theta = np.deg2rad(np.asarray(angles_inc, dtype=float))[np.newaxis, :]
+        shape = np.broadcast_shapes(omega.shape, theta.shape)
+
+        media = self._media()
+        last = len(media) - 1
+        velocities = [_velocities(material, fluid, frequencies)
+                      for material, thickness, fluid in media]
+        p = np.sin(theta) / velocities[0][0]
+
+        # 1. 各介质的下行/上行分波，形状 (..., 4, n)，n 为波型数（流体 1，固体 2）
+        waves = []   # (kinds, V_down, V_up, E)
+        for m, (material, thickness, fluid) in enumerate(media):
+            kinds = ('P',) if fluid else ('P', 'S')
+            down = [partial_wave(material.density, *velocities[m], p, kind, 1) for kind in kinds]
+            V_down = np.stack([np.broadcast_to(V, shape + (4,)) for V, _ in down], axis=-1)
+            # q -> -q：上行波只是部分分量变号
+            V_up = V_down * _REVERSED[:, :len(kinds)]
+            # 下行波以层顶为参考，上行波以层底为参考；穿过整层的相位因子对两者相同
+            E = None if thickness is None else np.stack(
+                [np.exp(1j * omega * q * thickness) for _, q in down], axis=-1)
+            waves.append((kinds, V_down, V_up, E))
+
+        # 2. 自底向上逐界面消元：u_i = R_i D_i（D_i 为界面 i 上方的下行波），
+        #    d_{i+1} = T_i D_i；与整体矩阵同一组方程，相位因子 |exp(iωqh)| <= 1
+        R, T = [None] * last, [None] * last
+        for i in range(last - 1, -1, -1):
+            _, V_a, U_a, _ = waves[i]
+            _, V_b, U_b, E_b = waves[i + 1]
+            if i + 1 < last:
+                # 层 b 顶部的上行波 = E_b R_b E_b d_b
+                V_b = V_b + U_b @ (E_b[..., :, np.newaxis] * R[i + 1] * E_b[..., np.newaxis, :])
+            rows = interface_rows(media[i][2], media[i + 1][2])
+            n_up = U_a.shape[-1]
+            M = np.zeros(shape + (len(rows), n_up + V_b.shape[-1]), dtype=np.complex128)
+            rhs = np.zeros(shape + (len(rows), V_a.shape[-1]), dtype=np.complex128)
+            for r, (comp, side) in enumerate(rows):
+                if side != 1:
+                    M[..., r, :n_up] = U_a[..., comp, :]
+                    np.negative(V_a[..., comp, :], out=rhs[..., r, :])
+                if side != 0:
+                    np.negative(V_b[..., comp, :], out=M[..., r, n_up:])
+            Y = np.linalg.solve(M, rhs)
+            R[i], T[i] = Y[..., :n_up, :], Y[..., n_up:, :]
+
+        # 3. 自顶向下传递：入射为单位振幅 P 波
+        D = np.zeros(shape + (len(waves[0][0]), 1), dtype=np.complex128)
+        D[..., 0, 0] = 1.0
+        reflected = (R[0] @ D)[..., 0]
+        for i in range(last):
+            D = T[i] @ D
+            if i + 1 < last:
+                D = waves[i + 1][3][..., np.newaxis] * D
+        transmitted = D[..., 0]
+
+        # 4. 能量系数：各波 z 向能流与入射波能流之比
+        flux_inc = energy_flux(waves[0][1][..., 0])
+        coeffs = {key: np.zeros(shape) for key in ('R_P', 'R_S', 'T_P', 'T_S')}
+        amplitudes = {key: np.zeros(shape, dtype=np.complex128) for key in coeffs}
+        for prefix, X, V in (('R_', reflected, waves[0][2]), ('T_', transmitted, waves[last][1])):
+            for k, kind in enumerate(waves[0 if prefix == 'R_' else last][0]):
+                key = prefix + kind
+                amplitudes[key] = X[..., k]
+                coeffs[key] = np.abs(X[..., k])**2 * np.abs(energy_flux(V[..., k])) / flux_inc
+        coeffs['amplitudes'] = amplitudes
+        return coeffs
+
+
+SCATTERING_MODES = ('P1', 'S1', 'P2', 'S2')
+
+
+def interface_scattering_matrix(material1, material2, p, frequency=None):
+    """
+    Full P-SV scattering matrix of a single interface.
+
+    Incoming waves are the down-going P/S waves in medium 1 and the up-going
+    P/S waves in medium 2; outgoing waves are the up-going waves in medium 1
+    and the down-going waves in medium 2, both ordered as SCATTERING_MODES.
+    The boundary matrix of the outgoing waves is the same for every incoming
+    wave, so all incoming modes are solved as right-hand sides of one batched
+    call.
+
+    :param p: Horizontal slowness (in s/m), any shape.
+    :param frequency: If given (in Hz), attenuating materials use their complex
+                      velocities at this frequency.
+    :return: A dict with 'amplitude' (complex, p.shape + (4, 4)) and
+             'energy' (float, same shape), indexed [..., outgoing, incoming].
+             Rows/columns of modes that do not exist (S in a fluid) and
+             energy columns of evanescent incoming waves are 0.
+    """
+    require_isotropic('interface_scattering_matrix', material1, material2)
+    p = np.asarray(p)
+    media = []
+    for material in (material1, material2):
+        fluid = material.is_fluid
+        if frequency is None:
+            media.append((material.density, material.vp, 0.0 if fluid else material.vs, fluid))
+        else:
+            vp, vs = _velocities(material, fluid, np.atleast_1d(frequency))
+            media.append((material.density, vp[0, 0], vs if fluid else vs[0, 0], fluid))
+
+    def waves(direction_1, direction_2):
+        result = []
+        for index, mode in enumerate(SCATTERING_MODES):
+            m = int(mode[1]) - 1
+            rho, vp, vs, fluid = media[m]
+            if mode[0] == 'S' and fluid:
+                continue
+            direction = direction_1 if m == 0 else direction_2
+            V, _ = partial_wave(rho, vp, vs, p, mode[0], direction)
+            result.append((index, m, V))
+        return result
+
+    outgoing = waves(-1, 1)
+    incoming = waves(1, -1)
+    rows = interface_rows(media[0][3], media[1][3])
+
+    def boundary(waves_list):
+        B = np.zeros(p.shape + (len(rows), len(waves_list)), dtype=np.complex128)
+        for r, (comp, side) in enumerate(rows):
+            for col, (index, m, V) in enumerate(waves_list):
+                if side is not None and side != m:
+                    continue
+                B[..., r, col] = (1.0 if m == 0 else -1.0) * V[..., comp]
+        return B
+
+    S_sub = np.linalg.solve(boundary(outgoing), -boundary(incoming))
+
+    amplitude = np.zeros(p.shape + (4, 4), dtype=np.complex128)
+    energy = np.zeros(p.shape + (4, 4))
+    for o, (index_o, _, V_o) in enumerate(outgoing):
+        flux_o = np.abs(energy_flux(V_o))
+        for i, (index_i, _, V_i) in enumerate(incoming):
+            flux_i = np.abs(energy_flux(V_i))
+            amplitude[..., index_o, index_i] = S_sub[..., o, i]
+            ratio = np.divide(flux_o, flux_i, out=np.zeros_like(flux_i),
+                              where=flux_i > 1e-12 * np.max(flux_i, initial=0.0))
+            energy[..., index_o, index_i] = np.abs(S_sub[..., o, i])**2 * ratio
+    return {'amplitude': amplitude, 'energy': energy}
+
+
+def interface_system(p, rho1, cP1, cS1, rho2, cP2, cS2, fluid1, fluid2):
+    """
+    Boundary-condition system of an interface in displacement/stress form.
+
+    Only the waves that exist are unknowns: 4 for solid–solid, 3 for
+    fluid–solid (R_P, T_P, T_S) and solid–fluid (R_P, R_S, T_P), 2 for
+    fluid–fluid. The stress rows are
+    normalised by ρ1·cP1 so all rows are O(1).
+
+    :param p: Horizontal slowness sin(θ)/cP1 (in s/m); may exceed 1/cP1,
+              the waves are then evanescent. All arguments broadcast.
+    :param fluid1: True if medium 1 is a fluid (cS1 is then ignored).
+    :param fluid2: True if medium 2 is a fluid (cS2 is then ignored).
+    :return: A tuple (M, b, keys, outgoing, incident): M (..., n, n) and
+             b (..., n) for P incidence, the coefficient key of every
+             column, and the displacement/stress vectors (..., 4) of the
+             outgoing and incident waves.
+    """
+    # 输入速度沿用 RT_Cal_v2 的 Im(c) > 0 约定，本模块使用 exp(-iωt)，故取共轭
+    p, rho1, cP1, cS1, rho2, cP2, cS2 = np.broadcast_arrays(
+        p, rho1, np.conj(cP1), np.conj(cS1), rho2, np.conj(cP2), np.conj(cS2))
+    media = ((rho1, cP1, 0.0 if fluid1 else cS1),
+             (rho2, cP2, 0.0 if fluid2 else cS2))
+    z_ref = np.abs(rho1 * cP1)[..., np.newaxis]
+
+    def wave(m, kind, direction):
+        V, _ = partial_wave(*media[m], p, kind, direction)
+        V[..., _SZZ:] /= z_ref
+        return V
+
+    columns = [('R_P', 0, wave(0, 'P', -1))]
+    if not fluid1:
+        columns.append(('R_S', 0, wave(0, 'S', -1)))
+    columns.append(('T_P', 1, wave(1, 'P', 1)))
+    if not fluid2:
+        columns.append(('T_S', 1, wave(1, 'S', 1)))
+    incident = wave(0, 'P', 1)
+
+    M, b = boundary_system(fluid1, fluid2, [(m, V) for _, m, V in columns], incident)
+    keys = [key for key, _, _ in columns]
+    outgoing = [V for _, _, V in columns]
+    return M, b, keys, outgoing, incident
+
+
+# 掠入射判据：|cos θ_P1| 不超过该值（逐点判断）
+GRAZING_TOL = 1e-6
+
+
+def _special_cases(theta_P1, rho1, cP1, cS1, rho2, cP2, cS2, fluid1, fluid2):
+    """
+    Points of the fluid kernel that are handled in closed form.
+
+    identical: both media are the same, there is no interface (T_P = 1).
+    grazing: the incident P wave travels along the interface (cos θ_P1 ≈ 0
+    at that point, independent of the other angles); it carries no energy
+    flux into the interface and is totally reflected (R_P = 1). For
+    identical media or equal P speeds the reduced system is singular there.
+    """
+    identical = (rho1 == rho2) & (cP1 == cP2)
+    if fluid1 != fluid2:
+        identical = np.zeros_like(identical)
+    elif not fluid1:
+        identical = identical & (cS1 == cS2)
+    q = _vertical_slowness(cP1, np.sin(theta_P1) / cP1)
+    grazing = (np.abs(q * cP1) <= GRAZING_TOL) & ~identical
+    return identical, grazing
+
+
+def nonsingular(M, tol=1e-13):
+    """
+    Mask of the regular matrices of a stack: |det M| relative to the
+    product of the row norms (Hadamard bound) exceeds tol.
+    """
+    scale = np.prod(np.linalg.norm(M, axis=-1), axis=-1)
+    return np.abs(np.linalg.det(M)) > tol * scale
+
+
+def interface_coefficients(theta_P1, rho1, cP1, cS1, rho2, cP2, cS2, fluid1, fluid2):
+    """
+    Energy coefficients for P incidence on any isotropic interface.
+
+    Instead of padding a fluid with a stand-in shear speed, only the waves
+    that exist are solved for (see interface_system). Normal incidence uses
+    the closed form
+    R = (Z2 - Z1)/(Z2 + Z1); identical media and grazing incidence are
+    handled in closed form (see _special_cases), any remaining singular
+    point is NaN.
+
+    In attenuating media the partial waves are inhomogeneous and the energy
+    flux of their sum contains interference terms. The reflected and the
+    transmitted power are therefore the flux of the summed reflected and
+    transmitted fields at the interface, cross terms included, shared
+    between the P and S keys in proportion to their per-mode fluxes. In
+    lossless media the cross terms vanish and the keys are the per-mode
+    values. R + T = 1 holds whenever medium 1 is lossless; the interference
+    between incident and reflected waves in an attenuating medium 1 is not
+    assigned to any key.
+
+    :param theta_P1: Incidence angle(s) in radians; all arguments broadcast.
+    :param fluid1: True if medium 1 is a fluid (cS1 is then ignored).
+    :param fluid2: True if medium 2 is a fluid (cS2 is then ignored).
+    :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'; modes that do not
+             exist are 0.
+    """
+    # 数据库中的整数参数先转为浮点，避免阻抗平方溢出
+    theta_P1, rho1, cP1, cS1, rho2, cP2, cS2 = np.broadcast_arrays(
+        theta_P1, np.asarray(rho1, dtype=float), cP1, cS1,
+        np.asarray(rho2, dtype=float), cP2, cS2)
+    shape = theta_P1.shape
+    coeffs = {key: np.zeros(shape) for key in ('R_P', 'R_S', 'T_P', 'T_S')}
+
+    # 0. 相同介质（无界面）与掠入射：解析结果
+    identical, grazing = _special_cases(theta_P1, rho1, cP1, cS1, rho2, cP2, cS2,
+                                        fluid1, fluid2)
+    coeffs['T_P'][identical] = 1.0
+    coeffs['R_P'][grazing] = 1.0
+
+    # 1. 垂直入射：无波型转换，直接用阻抗公式（对速度取共轭不影响结果）
+    normal = (theta_P1 == 0) & ~identical
+    if normal.any():
+        Z1 = rho1[normal] * cP1[normal]
+        Z2 = rho2[normal] * cP2[normal]
+        coeffs['R_P'][normal] = np.abs((Z2 - Z1) / (Z2 + Z1))**2
+        coeffs['T_P'][normal] = (4 * np.abs(Z1)**2 * np.real(Z2)
+                                  / (np.real(Z1) * np.abs(Z1 + Z2)**2))
+
+    oblique = ~(normal | identical | grazing)
+    if not oblique.any():
+        return coeffs
+
+    # 2. 斜入射：只对实际存在的波求解 3x3（或 2x2）方程组，奇异点记为 NaN
+    p = np.sin(theta_P1[oblique]) / cP1[oblique]
+    M, b, keys, outgoing, incident = interface_system(
+        p, rho1[oblique], cP1[oblique], cS1[oblique],
+        rho2[oblique], cP2[oblique], cS2[oblique], fluid1, fluid2)
+    regular = nonsingular(M)
+    X = np.full(b.shape, np.nan, dtype=np.complex128)
+    X[regular] = np.linalg.solve(M[regular], b[regular][..., np.newaxis])[..., 0]
+
+    # 3. 能量系数 = 振幅平方 × 能流比
+    flux_inc = energy_flux(incident)
+    energies = []
+    for col, (key, V) in enumerate(zip(keys, outgoing)):
+        amplitude2 = np.abs(X[..., col])**2
+        if key == 'R_P':
+            energies.append(amplitude2)
+        else:
+            energies.append(amplitude2 * np.abs(energy_flux(V)) / flux_inc)
+
+    # 4. 衰减介质中非均匀波之间有干涉能流：每一侧按合成场的总能流
+    #    重新分配（无损介质中交叉项为 0，结果不变）
+    for side, sign in (('R', -1.0), ('T', 1.0)):
+        cols = [col for col, key in enumerate(keys) if key[0] == side]
+        field = sum(X[..., col, np.newaxis] * outgoing[col] for col in cols)
+        total = sign * energy_flux(field) / flux_inc
+        per_mode = sum(energies[col] for col in cols)
+        scale = np.divide(total, per_mode, out=np.ones_like(total), where=per_mode > 0)
+        for col in cols:
+            coeffs[keys[col]][oblique] = energies[col] * scale
+    return coeffs
+
+
+def _dual_flux(V):
+    # energy_flux 的 Dual 版本
+    return -(V[_SZZ] * V[_UZ].conj() + V[_SXZ] * V[_UX].conj()).real
+
+
+def interface_sensitivities(theta_P1, rho1, cP1, cS1, rho2, cP2, cS2, fluid1, fluid2):
+    """
+    interface_coefficients together with the derivatives of every
+    coefficient with respect to (rho1, cP1, cS1, rho2, cP2, cS2).
+
+    The reduced system is differentiated analytically (M dX = db - dM X);
+    M is inverted once per point and applied to b and to the six derivative
+    right-hand sides. Derivatives with respect to the shear speed of a
+    fluid side are 0.
+
+    :return: A tuple (coeffs, sensitivities); sensitivities[key] has the
+             broadcast shape + (6,).
+    """
+    n = 6
+    theta_P1, rho1, cP1, cS1, rho2, cP2, cS2 = np.broadcast_arrays(
+        theta_P1, np.asarray(rho1, dtype=float), cP1, cS1,
+        np.asarray(rho2, dtype=float), cP2, cS2)
+    shape = theta_P1.shape
+    keys = ('R_P', 'R_S', 'T_P', 'T_S')
+    coeffs = {key: np.zeros(shape) for key in keys}
+    sensitivities = {key: np.zeros(shape + (n,)) for key in keys}
+
+    def seed(values, mask):
+        # 速度取共轭（exp(-iωt) 约定），对实参数的导数不变
+        values = [v[mask] for v in values]
+        values[1:3] = [np.conj(v) for v in values[1:3]]
+        values[4:6] = [np.conj(v) for v in values[4:6]]
+        return [Dual.variable(v, i, n) for i, v in enumerate(values)]
+
+    def store(key, energy, mask):
+        coeffs[key][mask] = np.real(energy.value)
+        sensitivities[key][mask] = np.real(energy.gradient(n))
+
+    params = (rho1, cP1, cS1, rho2, cP2, cS2)
+
+    # 0. 相同介质与掠入射：解析结果，对材料参数的导数为 0
+    identical, grazing = _special_cases(theta_P1, *params, fluid1, fluid2)
+    coeffs['T_P'][identical] = 1.0
+    coeffs['R_P'][grazing] = 1.0
+
+    # 1. 垂直入射：阻抗公式
+    normal = (theta_P1 == 0) & ~identical
+    if normal.any():
+        r1, p1, _, r2, p2, _ = seed(params, normal)
+        Z1, Z2 = r1 * p1, r2 * p2
+        R = (Z2 - Z1) / (Z2 + Z1)
+        store('R_P', (R * R.conj()).real, normal)
+        store('T_P', 4 * (Z1 * Z1.conj()).real * Z2.real
+              / (Z1.real * ((Z1 + Z2) * (Z1 + Z2).conj()).real), normal)
+
+    oblique = ~(normal | identical | grazing)
+    if not oblique.any():
+        return coeffs, sensitivities
+
+    # 2. 斜入射：与 interface_system 相同的方程组，分量用 Dual 表示
+    r1, p1, s1, r2, p2, s2 = seed(params, oblique)
+    media = ((r1, p1, 0.0 if fluid1 else s1), (r2, p2, 0.0 if fluid2 else s2))
+    p = np.sin(theta_P1[oblique]) / p1
+    z_ref = np.abs(r1.value * p1.value)
+
+    def wave(m, kind, direction):
+        rho, vp, vs = media[m]
+        c = vp if kind == 'P' else vs
+        q = (1 / c**2 - p**2).root(direction * _vertical_slowness(c.value, p.value))
+        V = list(_wave_components(rho, vp, vs, p, q, kind))
+        # 应力行按常数 z_ref 缩放，不改变 X 与能流比
+        V[_SZZ], V[_SXZ] = V[_SZZ] / z_ref, V[_SXZ] / z_ref
+        return V
+
+    columns = [('R_P', 0, wave(0, 'P', -1))]
+    if not fluid1:
+        columns.append(('R_S', 0, wave(0, 'S', -1)))
+    columns.append(('T_P', 1, wave(1, 'P', 1)))
+    if not fluid2:
+        columns.append(('T_S', 1, wave(1, 'S', 1)))
+    incident = wave(0, 'P', 1)
+
+    rows = interface_rows(fluid1, fluid2)
+    size = len(rows)
+    count = int(np.count_nonzero(oblique))
+    M = np.zeros((count, size, size), dtype=np.complex128)
+    dM = np.zeros((count, n, size, size), dtype=np.complex128)
+    b = np.zeros((count, size), dtype=np.complex128)
+    db = np.zeros((count, n, size), dtype=np.complex128)
+    for r, (comp, side) in enumerate(rows):
+        for col, (_, m, V) in enumerate(columns):
+            if side is None or side == m:
+                sign = 1.0 if m == 0 else -1.0
+                M[:, r, col] = sign * V[comp].value
+                dM[:, :, r, col] = sign * V[comp].gradient(n)
+        if side is None or side == 0:
+            b[:, r] = -incident[comp].value
+            db[:, :, r] = -incident[comp].gradient(n)
+
+    # 奇异点（解析情形以外）记为 NaN
+    regular = nonsingular(M)
+    M_inv = np.full(M.shape, np.nan, dtype=np.complex128)
+    M_inv[regular] = np.linalg.inv(M[regular])
+    X = (M_inv @ b[..., np.newaxis])[..., 0]
+    rhs = db - (dM @ X[:, np.newaxis, :, np.newaxis])[..., 0]
+    dX = (M_inv[:, np.newaxis] @ rhs[..., np.newaxis])[..., 0]
+
+    # 3. 能量系数 = 振幅平方 × 能流比
+    flux_inc = _dual_flux(incident)
+    for col, (key, _, V) in enumerate(columns):
+        amplitude = Dual(X[:, col], dX[:, :, col])
+        energy = (amplitude * amplitude.conj()).real
+        if key != 'R_P':
+            flux = _dual_flux(V)
+            energy = energy * (flux * np.sign(flux.value)) / flux_inc
+        store(key, energy, oblique)
+    return coeffs, sensitivities
@@ -0,0 +1,209 @@
+"""
+Incidence-angle and coupling-material optimisation.
+
+Instead of reading the best angle off plot_intensity curves, the functions
+below search for the incidence angle and coupling medium that maximise an
+objective built from the energy coefficients, e.g. T_S inside a
+mode-conversion window (restrict angle_bounds) or T_P minus the shear
+leakage. The coefficients come from RT_Multilayer.interface_coefficients
+for every solid/fluid combination.
+
+- optimize_catalog: every material of a catalog, each at its best angle.
+  All candidates are evaluated together on an angle grid that is zoomed in
+  around the best sample a few times.
+- optimize_continuous: free (density, vp, vs, angle) by a vectorized
+  differential evolution; every generation is one batched kernel call.
+- optimize_substrates: either of the above for several substrates on a
+  process pool.
+
+The objective is a key of OBJECTIVES or a function mapping the coefficient
+dict to an array (module-level, so it can be sent to worker processes).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Cal_v2 import COEFFICIENT_KEYS
+from RT_Multilayer import interface_coefficients
+from RT_Sweep import MAX_VS_VP_RATIO
+
+
+def _transmission_minus_leakage(coeffs):
+    return coeffs['T_P'] - coeffs['T_S']
+
+
+OBJECTIVES = {key: itemgetter(key) for key in COEFFICIENT_KEYS}
+OBJECTIVES['T_P-leakage'] = _transmission_minus_leakage
+
+
+def evaluate_objective(objective, angles_inc, rho1, cP1, cS1, substrate, fluid1=False):
+    """
+    Objective for coupling media with the given parameters on a substrate.
+
+    :param objective: A key of OBJECTIVES or a function of the coefficient dict.
+    :param angles_inc: Incidence angles (in degrees); all parameters broadcast.
+    :param substrate: The transmission Material.
+    :param fluid1: True if the coupling media are fluids (cS1 is ignored).
+    :return: A float array; -inf where the solve failed.
+    """
+    require_isotropic('evaluate_objective', substrate)
+    objective = OBJECTIVES[objective] if isinstance(objective, str) else objective
+    theta_P1 = np.deg2rad(np.asarray(angles_inc, dtype=float))
+    coeffs = interface_coefficients(theta_P1, rho1, cP1, np.asarray(cS1) + 0j,
+                                    substrate.density, substrate.vp,
+                                    complex(substrate.vs), fluid1, substrate.is_fluid)
+    value = np.asarray(objective(coeffs), dtype=float)
+    return np.where(np.isfinite(value), value, -np.inf)
+
+
+def _zoom_maximize(f, lo, hi, n_grid, n_zoom):
+    # 批量网格搜索：每次在当前最优点两侧的相邻节点之间重新加密
+    lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+    u = np.linspace(0.0, 1.0, n_grid)
+    for _ in range(n_zoom + 1):
+        x = lo[..., np.newaxis] + (hi - lo)[..., np.newaxis] * u
+        values = f(x)
+        best = np.argmax(values, axis=-1)[..., np.newaxis]
+        x_best = np.take_along_axis(x, best, axis=-1)[..., 0]
+        value = np.take_along_axis(values, best, axis=-1)[..., 0]
+        step = (hi - lo) / (n_grid - 1)
+        lo, hi = np.maximum(lo, x_best - step), np.minimum(hi, x_best + step)
+    return x_best, value
+
+
+def optimize_catalog(substrate, materials, objective='T_S', angle_bounds=(0.0, 90.0),
+                     n_grid=181, n_zoom=4):
+    """
+    Best incidence angle for every catalog material on a substrate.
+
+    :param substrate: The transmission Material.
+    :param materials: Candidate coupling Materials, e.g. load_materials().
+    :param angle_bounds: Allowed incidence angles (in degrees).
+    :param n_grid: Angle samples per zoom level.
+    :param n_zoom: Number of zoom refinements.
+    :return: A list of dicts {'material', 'angle', 'value'}, best first.
+    """
+    require_isotropic('optimize_catalog', *materials)
+    results = []
+    for fluid1 in (False, True):
+        group = [mat for mat in materials if mat.is_fluid == fluid1]
+        if not group:
+            continue
+        rho1 = np.array([mat.density for mat in group], dtype=float)[:, np.newaxis]
+        cP1 = np.array([mat.vp for mat in group], dtype=float)[:, np.newaxis]
+        cS1 = np.array([mat.vs for mat in group], dtype=np.complex128)[:, np.newaxis]
+
+        def f(angles):
+            return evaluate_objective(objective, angles, rho1, cP1, cS1, substrate, fluid1)
+
+        lo = np.full(len(group), float(angle_bounds[0]))
+        hi = np.full(len(group), float(angle_bounds[1]))
+        angle, value = _zoom_maximize(f, lo, hi, n_grid, n_zoom)
+        results += [{'material': mat.name, 'angle': float(a), 'value': float(v)}
+                    for mat, a, v in zip(group, angle, value)]
+    results.sort(key=lambda r: -r['value'])
+    return results
+
+
+def differential_evolution(func, bounds, popsize=40, generations=300, F=0.7, CR=0.9,
+                           tol=1e-8, seed=None):
+    """
+    Maximise func over a box with DE/rand/1/bin, one batched call per generation.
+
+    :param func: Maps a (P, D) array of candidates to a (P,) array.
+    :param bounds: A sequence of D (low, high) pairs.
+    :param tol: Stop once the spread of the population's values is below tol.
+    :return: A tuple (x, value, n_generations).
+    """
+    rng = np.random.default_rng(seed)
+    bounds = np.asarray(bounds, dtype=float)
+    lo, hi = bounds[:, 0], bounds[:, 1]
+    P, D = popsize, len(bounds)
+
+    population = lo + rng.random((P, D)) * (hi - lo)
+    fitness = func(population)
+    rows = np.arange(P)
+    generation = 0
+    for generation in range(1, generations + 1):
+        # 三个互不相同且不等于自身的个体
+        offsets = np.argsort(rng.random((P, P - 1)), axis=1)[:, :3] + 1
+        r0, r1, r2 = ((rows[:, np.newaxis] + offsets) % P).T
+        mutant = np.clip(population[r0] + F * (population[r1] - population[r2]), lo, hi)
+
+        cross = rng.random((P, D)) < CR
+        cross[rows, rng.integers(D, size=P)] = True
+        trial = np.where(cross, mutant, population)
+        trial_fitness = func(trial)
+
+        better = trial_fitness >= fitness
+        population[better] = trial[better]
+        fitness[better] = trial_fitness[better]
+        finite = fitness[np.isfinite(fitness)]
+        if finite.size == P and finite.max() - finite.min() < tol:
+            break
+
+    best = np.argmax(fitness)
+    return population[best], float(fitness[best]), generation
+
+
+def optimize_continuous(substrate, bounds, objective='T_S', fluid=False, popsize=40,
+                        generations=300, tol=1e-8, seed=None):
+    """
+    Best hypothetical coupling medium and incidence angle on a substrate.
+
+    Candidates with vs/vp >= MAX_VS_VP_RATIO are rejected.
+
+    :param substrate: The transmission Material.
+    :param bounds: A dict with (low, high) for 'density', 'vp', 'vs' and
+                   'angle' (in degrees); use low == high to fix a parameter.
+                   'vs' is not needed when fluid is True.
+    :param fluid: Search over fluid coupling media.
+    :return: A dict {'density', 'vp', 'vs', 'angle', 'value', 'generations'}.
+    """
+    names = ('density', 'vp', 'angle') if fluid else ('density', 'vp', 'vs', 'angle')
+
+    def f(x):
+        params = dict(zip(names, x.T))
+        cS1 = np.zeros_like(params['vp']) if fluid else params['vs']
+        value = evaluate_objective(objective, params['angle'], params['density'],
+                                   params['vp'], cS1, substrate, fluid)
+        return np.where(cS1 < MAX_VS_VP_RATIO * params['vp'], value, -np.inf)
+
+    x, value, n_generations = differential_evolution(
+        f, [bounds[name] for name in names], popsize, generations, tol=tol, seed=seed)
+    result = dict(zip(names, (float(v) for v in x)))
+    result.setdefault('vs', 0.0)
+    result.update(value=value, generations=n_generations)
+    return result
+
+
+_METHODS = {'catalog': optimize_catalog, 'continuous': optimize_continuous}
+
+
+def _optimize_one(task):
+    method, substrate, args, kwargs = task
+    return _METHODS[method](substrate, *args, **kwargs)
+
+
+def optimize_substrates(substrates, method='catalog', *args, n_workers=None, **kwargs):
+    """
+    Run optimize_catalog or optimize_continuous for several substrates in parallel.
+
+    :param substrates: Transmission Materials.
+    :param method: 'catalog' or 'continuous'.
+    :param args: Further positional arguments of the chosen function.
+    :param n_workers: Worker processes; None uses all cores, 1 runs in
+                      this process.
+    :param kwargs: Further keyword arguments of the chosen function.
+    :return: A dict substrate name -> result of the chosen function.
+    """
+    tasks = [(method, substrate, args, kwargs) for substrate in substrates]
+    if n_workers == 1:
+        results = list(map(_optimize_one, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_optimize_one, tasks))
+    return {substrate.name: result for substrate, result in zip(substrates, results)}
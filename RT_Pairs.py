@@ -0,0 +1,169 @@
+"""
+All-pairs screening of coupling media.
+
+Every material of the database is combined with every other material
+(incident medium × transmission medium) and the energy coefficients are
+evaluated for a whole angle grid in one batched computation per solid/fluid
+group with RT_Multilayer.interface_coefficients.
+"""
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Aperture import aperture_coefficients
+from RT_Cal_v2 import COEFFICIENT_KEYS, critical_angles
+from RT_Multilayer import interface_coefficients
+from RT_Roots import characteristic_roots
+from RT_Validate import validate_energy
+
+
+class RT_Pairs:
+    """
+    A class for evaluating reflection and transmission coefficients for all
+    ordered pairs of a material table at once.
+    """
+
+    def __init__(self, materials):
+        """
+        Initialize the RT_Pairs object with a list of Material instances.
+
+        :param materials: The material table, e.g. from Material.load_materials().
+        """
+        self.materials = list(materials)
+        require_isotropic('RT_Pairs', *self.materials)
+        self.names = [mat.name for mat in self.materials]
+
+        self.density = np.array([mat.density for mat in self.materials], dtype=float)
+        self.vp = np.array([mat.vp for mat in self.materials], dtype=float)
+        self.vs = np.array([mat.vs for mat in self.materials], dtype=np.complex128)
+        self.is_fluid = np.array([mat.is_fluid for mat in self.materials], dtype=bool)
+
+    def index(self, name):
+        """
+        Return the position of a material in the table (case-insensitive).
+        """
+        return [n.lower() for n in self.names].index(name.lower())
+
+    def calculate_critical_angles(self):
+        """
+        Critical angles for every (incident, transmission) pair.
+
+        :return: An (N, N, 2) array; [..., 0] is the P-wave and [..., 1] the
+                 S-wave critical angle (in degrees), indexed [incident, transmission].
+        """
+        cP1 = self.vp[:, np.newaxis]
+        cP2 = self.vp[np.newaxis, :]
+        cS2 = self.vs[np.newaxis, :]
+        critical_angle_p, critical_angle_s = critical_angles(cP1, cP2, cS2)
+        return np.stack([critical_angle_p, critical_angle_s], axis=-1)
+
+    def calculate_characteristic_roots(self, n_grid=256):
+        """
+        Critical, leaky Rayleigh and interface-wave conditions for every pair.
+
+        Solved in one batched root search per solid/fluid group, see
+        RT_Roots.characteristic_roots; conditions that do not exist are NaN.
+
+        :return: A dict of (N, N) arrays indexed [incident, transmission] with
+                 keys 'critical_p', 'critical_s', 'rayleigh' (in degrees),
+                 'rayleigh_velocity' and 'interface_velocity' (in m/s).
+        """
+        n = len(self.materials)
+        roots = {}
+        for rows, cols, fluid1, fluid2 in self._groups():
+            group = characteristic_roots(
+                self.density[rows, np.newaxis], self.vp[rows, np.newaxis],
+                self.vs[rows, np.newaxis], self.density[np.newaxis, cols],
+                self.vp[np.newaxis, cols], self.vs[np.newaxis, cols],
+                fluid1, fluid2, n_grid=n_grid)
+            for key, value in group.items():
+                roots.setdefault(key, np.full((n, n), np.nan))[np.ix_(rows, cols)] = value
+        return roots
+
+    def _groups(self):
+        # 按（固/流, 固/流）把材料对分组，每组一次批量计算
+        solid = np.flatnonzero(~self.is_fluid)
+        fluid = np.flatnonzero(self.is_fluid)
+        for rows, fluid1 in ((solid, False), (fluid, True)):
+            for cols, fluid2 in ((solid, False), (fluid, True)):
+                if rows.size and cols.size:
+                    yield rows, cols, fluid1, fluid2
+
+    def calculate_intensity_tensor(self, angles_inc):
+        """
+        Energy coefficients for every pair and every incidence angle.
+
+        Every group is solved with the displacement/stress system of
+        RT_Multilayer.interface_coefficients, which carries only the waves
+        that exist and handles identical media and grazing incidence in
+        closed form.
+
+        :param angles_inc: 1-D array of K incidence angles (in degrees).
+        :return: An (N, N, K, 4) array indexed [incident, transmission, angle,
+                 coefficient] with coefficients ordered as COEFFICIENT_KEYS.
+        """
+        theta_P1 = np.deg2rad(np.asarray(angles_inc, dtype=float))[np.newaxis, np.newaxis, :]
+
+        # 介质1沿第 0 轴广播，介质2沿第 1 轴广播
+        rho1 = self.density[:, np.newaxis, np.newaxis]
+        cP1 = self.vp[:, np.newaxis, np.newaxis]
+        cS1 = self.vs[:, np.newaxis, np.newaxis]
+        rho2 = self.density[np.newaxis, :, np.newaxis]
+        cP2 = self.vp[np.newaxis, :, np.newaxis]
+        cS2 = self.vs[np.newaxis, :, np.newaxis]
+
+        tensor = np.empty((len(self.materials), len(self.materials), theta_P1.shape[-1], 4))
+        for rows, cols, fluid1, fluid2 in self._groups():
+            coeffs = interface_coefficients(theta_P1, rho1[rows], cP1[rows], cS1[rows],
+                                            rho2[:, cols], cP2[:, cols], cS2[:, cols],
+                                            fluid1, fluid2)
+            tensor[np.ix_(rows, cols)] = np.stack(
+                [coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+        return tensor
+
+    def calculate_aperture_tensor(self, angles_inc, width, **kwargs):
+        """
+        Aperture-averaged energy coefficients for every pair and nominal angle.
+
+        :param angles_inc: 1-D array of K nominal incidence angles (in degrees).
+        :param width: Angular width of the probe (in degrees), see
+                      RT_Aperture.aperture_coefficients.
+        :param kwargs: Further keyword arguments of aperture_coefficients.
+        :return: An (N, N, K, 4) array laid out as calculate_intensity_tensor.
+        """
+        angles_inc = np.asarray(angles_inc, dtype=float)[np.newaxis, np.newaxis, :]
+        n = len(self.materials)
+        tensor = np.empty((n, n, angles_inc.shape[-1], 4))
+        for rows, cols, fluid1, fluid2 in self._groups():
+            coeffs = aperture_coefficients(
+                angles_inc, width, self.density[rows, np.newaxis, np.newaxis],
+                self.vp[rows, np.newaxis, np.newaxis], self.vs[rows, np.newaxis, np.newaxis],
+                self.density[np.newaxis, cols, np.newaxis], self.vp[np.newaxis, cols, np.newaxis],
+                self.vs[np.newaxis, cols, np.newaxis], fluid1, fluid2, **kwargs)
+            tensor[np.ix_(rows, cols)] = np.stack(
+                [coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+        return tensor
+
+    def find_energy_violations(self, tensor, angles_inc, tol=1e-3):
+        """
+        Energy-conservation check of a tensor from calculate_intensity_tensor.
+
+        :param tensor: The (N, N, K, 4) coefficient array.
+        :param angles_inc: The K incidence angles used to compute it (in degrees).
+        :param tol: Allowed absolute residual of R_P + R_S + T_P + T_S - 1.
+        :return: A tuple (report, violations). report is the dict returned by
+                 RT_Validate.validate_energy; violations is a dict of arrays
+                 with one entry per flagged point, non-finite residuals
+                 first and then largest |residual| first: 'material1' and
+                 'material2' (indices into self.names), 'angle' (in degrees)
+                 and 'residual'.
+        """
+        report = validate_energy(tensor, tol)
+        angles_inc = np.asarray(angles_inc, dtype=float)
+        i, j, k = np.nonzero(report['violations'])
+        residual = report['residual'][i, j, k]
+        # 非有限值排在最前，其余按 |residual| 降序
+        severity = np.where(np.isfinite(residual), np.abs(residual), np.inf)
+        order = np.argsort(-severity, kind='stable')
+        return report, {'material1': i[order], 'material2': j[order],
+                        'angle': angles_inc[k[order]], 'residual': residual[order]}
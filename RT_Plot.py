@@ -2,28 +2,42 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 from RT_Cal_v2 import RT_Cal_v2  # 假设你的新类叫 RT_Cal_v2
+from RT_Adaptive import adaptive_intensity_sweep
 
 class RT_Plot:
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        :param cache: Optional RT_Cache shared by all plots of this object, so
+                      restyling a figure does not recompute the coefficients.
+        """
         plt.style.use('default')
+        self.cache = cache
 
-    def plot_intensity(self, rt_cal: RT_Cal_v2, material1, material2, resolution=0.1):
+    def plot_intensity(self, rt_cal: RT_Cal_v2, material1, material2, resolution=0.1, tol=None):
+        """
+        :param resolution: Angle step (in degrees) of the uniform grid.
+        :param tol: If given, sample adaptively with this absolute tolerance
+                    instead of using the uniform grid.
+        """
         # 1. 临界入射角
         max_angle_inc_l, max_angle_inc_s = rt_cal.calculate_critical_angles()
 
-        # 2. 角度数组
-        angles_l = np.arange(0, max_angle_inc_l + resolution, resolution)
-        angles_s = np.arange(0, max_angle_inc_s + resolution, resolution)
+        if tol is None:
+            # 2. 角度数组
+            angles_l = np.arange(0, max_angle_inc_l + resolution, resolution)
+            angles_s = np.arange(0, max_angle_inc_s + resolution, resolution)
 
-        # 3. 计算透射 P 波 和 T 波（即新算法的 'T_P' 和 'T_S'）
-        intensities_L = [
-            rt_cal.calculate_intensity_coef(angle)['T_P']
-            for angle in angles_l
-        ]
-        intensities_S = [
-            rt_cal.calculate_intensity_coef(angle)['T_S']
-            for angle in angles_s
-        ]
+            # 3. 计算透射 P 波 和 T 波（即新算法的 'T_P' 和 'T_S'）
+            intensities_L = rt_cal.calculate_intensity_coef_batch(angles_l, cache=self.cache)['T_P']
+            intensities_S = rt_cal.calculate_intensity_coef_batch(angles_s, cache=self.cache)['T_S']
+        else:
+            # 2./3. 自适应采样：在临界角附近自动加密
+            angles_l, coeffs_l = adaptive_intensity_sweep(
+                rt_cal, 0, max_angle_inc_l, tol, keys=('T_P',), cache=self.cache)
+            angles_s, coeffs_s = adaptive_intensity_sweep(
+                rt_cal, 0, max_angle_inc_s, tol, keys=('T_S',), cache=self.cache)
+            intensities_L = coeffs_l['T_P']
+            intensities_S = coeffs_s['T_S']
 
         # 4. 绘图
         title = f"{material1.name.title()}/{material2.name.title()}"
@@ -40,6 +54,31 @@ class RT_Plot:
         plt.grid(True)
         plt.show()
 
+    def plot_intensity_bands(self, bands, material1, material2):
+        """
+        Transmission curves with the Monte Carlo confidence band.
+
+        :param bands: Result of RT_MonteCarlo.monte_carlo_bands; the band is
+                      drawn between its first and last quantile, the line is
+                      the mean.
+        """
+        angles = bands['angles']
+        title = f"{material1.name.title()}/{material2.name.title()}"
+        plt.figure(figsize=(6, 5))
+        for key, label, style in (('T_P', r'$T^I_L$', '-'), ('T_S', r'$T^I_S$', '--')):
+            line, = plt.plot(angles, bands['mean'][key], linestyle=style, linewidth=2, label=label)
+            plt.fill_between(angles, bands['bands'][key][0], bands['bands'][key][-1],
+                             color=line.get_color(), alpha=0.25, linewidth=0)
+
+        plt.xlim(0, 90)
+        plt.ylim(0, 1.0)
+        plt.xlabel(r'Incidence Angle $\theta$ (°)', fontsize=12)
+        plt.ylabel(r'Transmission Intensity Coefficient $\frac{I}{I_{inc}}$', fontsize=12)
+        plt.title(title, fontsize=14)
+        plt.legend()
+        plt.grid(True)
+        plt.show()
+
     def plot_material_bars(self, interface2, materials_list, n_segments=100):
         group_width = 0.4
         bar_width = group_width / 8.0
@@ -54,16 +93,17 @@ class RT_Plot:
         s_bar_patch = None
 
         for i, material in enumerate(materials_list):
-            rt_cal = RT_Cal_v2(material, interface2)
+            rt_cal = RT_Cal_v2(material, interface2, cache=self.cache)
             crit_L, crit_S = rt_cal.calculate_critical_angles()
 
             # 左侧 P 波条
             x_left = group_positions[i] - bar_width
             y_vals_L = np.linspace(0, crit_L, n_segments + 1)
+            mids_L = (y_vals_L[:-1] + y_vals_L[1:])/2
+            I_p_vals = rt_cal.calculate_intensity_coef_batch(mids_L)['T_P']
             for j in range(n_segments):
                 y0, y1 = y_vals_L[j], y_vals_L[j+1]
-                mid = (y0 + y1)/2
-                I_p = rt_cal.calculate_intensity_coef(mid)['T_P']
+                I_p = I_p_vals[j]
                 rect = Rectangle((x_left, y0), bar_width, y1-y0,
                                  facecolor=cmap_p(I_p), edgecolor=None)
                 ax.add_patch(rect)
@@ -74,10 +114,11 @@ class RT_Plot:
             # 右侧 S 波条
             x_right = group_positions[i]
             y_vals_S = np.linspace(0, crit_S, n_segments + 1)
+            mids_S = (y_vals_S[:-1] + y_vals_S[1:])/2
+            I_s_vals = rt_cal.calculate_intensity_coef_batch(mids_S)['T_S']
             for j in range(n_segments):
                 y0, y1 = y_vals_S[j], y_vals_S[j+1]
-                mid = (y0 + y1)/2
-                I_s = rt_cal.calculate_intensity_coef(mid)['T_S']
+                I_s = I_s_vals[j]
                 rect = Rectangle((x_right, y0), bar_width, y1-y0,
                                  facecolor=cmap_s(I_s), edgecolor=None)
                 ax.add_patch(rect)
@@ -0,0 +1,131 @@
+"""
+Time-domain pulse transmission through a single interface.
+
+The energy coefficients describe one frequency and no phase, but the
+received waveform of a broadband transducer pulse is distorted wherever the
+coefficients are complex (beyond the critical angles) or frequency
+dependent (attenuating media). Here the pulse is transformed with an FFT,
+every frequency bin is multiplied by the complex displacement coefficient
+of the interface, and the result is transformed back.
+
+The coefficients of all bins, angles and material pairs are solved in one
+stacked call per solid/fluid group with the boundary system of
+RT_Multilayer.interface_system; attenuating materials enter with their
+complex velocities at every bin. Bins where the pulse spectrum is below
+threshold times its maximum are not solved and set to 0.
+
+Spectra and transfer functions use the e^{+iωt} convention of numpy.fft
+(as RT_Cal_v2); the waveforms are the displacements of the outgoing waves
+at the interface, relative to the incident displacement.
+"""
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Cal_v2 import COEFFICIENT_KEYS
+from RT_Multilayer import interface_system
+
+
+def tone_burst(frequency, n_cycles, sample_rate, n_samples=None):
+    """
+    Gaussian-windowed tone burst centred in the time window.
+
+    :param frequency: Centre frequency (in Hz).
+    :param n_cycles: Number of cycles within the ±2σ width of the window.
+    :param sample_rate: Sampling rate (in Hz).
+    :param n_samples: Length of the signal; defaults to four burst lengths.
+    :return: A tuple (t, signal) of 1-D arrays, t in s.
+    """
+    duration = n_cycles / frequency
+    if n_samples is None:
+        n_samples = int(np.ceil(4 * duration * sample_rate))
+    t = np.arange(n_samples) / sample_rate
+    t0 = t[n_samples // 2]
+    sigma = duration / 4
+    signal = np.exp(-0.5 * ((t - t0) / sigma)**2) * np.sin(2 * np.pi * frequency * (t - t0))
+    return t, signal
+
+
+def _group_parameters(materials, frequencies):
+    # 每种材料一行：频率相关的复速度，密度广播到频率轴
+    rho = np.array([float(m.density) for m in materials])[:, np.newaxis]
+    cP = np.stack([m.complex_vp(frequencies) for m in materials])
+    cS = np.stack([m.complex_vs(frequencies) for m in materials])
+    return rho, cP, cS
+
+
+def interface_transfer(pairs, angles_inc, frequencies):
+    """
+    Complex displacement coefficients of P incidence per pair, angle and frequency.
+
+    :param pairs: A sequence of P (material1, material2) tuples.
+    :param angles_inc: 1-D array of K incidence angles in material1 (in degrees).
+    :param frequencies: 1-D array of F frequencies (in Hz).
+    :return: A dict key -> complex array (P, K, F) with keys as
+             COEFFICIENT_KEYS (e^{+iωt} convention); modes that do not exist
+             are 0.
+    """
+    require_isotropic('interface_transfer', *(m for pair in pairs for m in pair))
+    frequencies = np.asarray(frequencies, dtype=float)
+    theta = np.deg2rad(np.asarray(angles_inc, dtype=float))[np.newaxis, :, np.newaxis]
+    shape = (len(pairs), theta.shape[1], frequencies.size)
+    transfer = {key: np.zeros(shape, dtype=np.complex128) for key in COEFFICIENT_KEYS}
+
+    groups = {}
+    for index, (material1, material2) in enumerate(pairs):
+        groups.setdefault((material1.is_fluid, material2.is_fluid), []).append(index)
+
+    for (fluid1, fluid2), indices in groups.items():
+        rho1, cP1, cS1 = _group_parameters([pairs[i][0] for i in indices], frequencies)
+        rho2, cP2, cS2 = _group_parameters([pairs[i][1] for i in indices], frequencies)
+        args = [a[:, np.newaxis] for a in (rho1, cP1, cS1, rho2, cP2, cS2)]
+
+        # 系统内部取共轭（exp(-iωt)），入射波的水平慢度与之一致
+        p = np.sin(theta) / np.conj(args[1])
+        M, b, keys, _, _ = interface_system(p, *args, fluid1, fluid2)
+        X = np.linalg.solve(M, b[..., np.newaxis])[..., 0]
+        for col, key in enumerate(keys):
+            transfer[key][indices] = np.conj(X[..., col])
+    return transfer
+
+
+def pulse_transmission(pairs, angles_inc, signal, sample_rate, threshold=1e-6):
+    """
+    Reflected and transmitted waveforms of a pulse for many pairs and angles.
+
+    :param pairs: A sequence of P (material1, material2) tuples.
+    :param angles_inc: 1-D array of K incidence angles in material1 (in degrees).
+    :param signal: 1-D incident displacement waveform of N samples, e.g. from
+                   tone_burst.
+    :param sample_rate: Sampling rate of signal (in Hz).
+    :param threshold: Bins with |spectrum| < threshold * max|spectrum| are
+                      skipped.
+    :return: A dict with
+             'time': (N,) in s,
+             'frequencies': the (F,) rfft frequencies in Hz,
+             'transfer': key -> (P, K, F) complex coefficients (0 at skipped bins),
+             'waveforms': key -> (P, K, N) real waveforms,
+             'peak': key -> (P, K) largest |waveform| relative to the
+             largest |signal|,
+             with keys as COEFFICIENT_KEYS.
+    """
+    signal = np.asarray(signal, dtype=float)
+    n = signal.size
+    frequencies = np.fft.rfftfreq(n, 1 / sample_rate)
+    spectrum = np.fft.rfft(signal)
+    active = np.abs(spectrum) >= threshold * np.abs(spectrum).max()
+
+    # 只对脉冲频带内的频点求解，其余频点的输出为 0
+    transfer_active = interface_transfer(pairs, angles_inc, frequencies[active])
+    reference = np.abs(signal).max()
+    result = {'time': np.arange(n) / sample_rate, 'frequencies': frequencies,
+              'transfer': {}, 'waveforms': {}, 'peak': {}}
+    for key in COEFFICIENT_KEYS:
+        transfer = np.zeros(transfer_active[key].shape[:2] + (frequencies.size,),
+                            dtype=np.complex128)
+        transfer[..., active] = transfer_active[key]
+        waveform = np.fft.irfft(spectrum * transfer, n, axis=-1)
+        result['transfer'][key] = transfer
+        result['waveforms'][key] = waveform
+        result['peak'][key] = np.abs(waveform).max(axis=-1) / reference
+    return result
@@ -0,0 +1,139 @@
+"""
+Characteristic angles of an interface from the boundary-condition determinant.
+
+Besides the two Snell critical angles, the response of an interface is
+shaped by the (leaky) Rayleigh angle, where the incident wave excites the
+surface wave of the substrate, and by the interface wave (Scholte wave on a
+fluid–solid interface, Stoneley wave between two solids), which travels
+slower than every bulk wave and therefore has no real incidence angle.
+
+Both follow from det M(p) of the displacement/stress boundary conditions of
+the interface, RT_Multilayer.interface_system (4x4 for solid–solid
+pairs, reduced when a side is a fluid), written in the horizontal slowness
+p so that it stays finite past every critical angle. The determinant is
+sampled for all pairs at once on a slowness grid, the minimum is bracketed
+and refined by a batched golden-section search.
+"""
+
+import numpy as np
+
+from RT_Multilayer import interface_system
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def boundary_determinant(p, rho1, cP1, cS1, rho2, cP2, cS2, fluid1=False, fluid2=False):
+    """
+    Determinant of the boundary-condition matrix at horizontal slowness p.
+
+    :param p: Horizontal slowness sin(θ)/cP1 (in s/m); values above 1/cP1
+              give a complex incidence angle. All arguments broadcast.
+    :param fluid1: True if medium 1 is a fluid.
+    :param fluid2: True if medium 2 is a fluid.
+    :return: A complex array with the broadcast shape.
+    """
+    M = interface_system(p, rho1, cP1, cS1, rho2, cP2, cS2, fluid1, fluid2)[0]
+    return np.linalg.det(M)
+
+
+def _refine_minimum(f, lo, hi, n_iter):
+    # 批量黄金分割搜索：每个区间 [lo, hi] 内 |f| 的极小值
+    a, b = lo.copy(), hi.copy()
+    x1 = b - GOLDEN * (b - a)
+    x2 = a + GOLDEN * (b - a)
+    f1, f2 = np.abs(f(x1)), np.abs(f(x2))
+    for _ in range(n_iter):
+        left = f1 < f2
+        b = np.where(left, x2, b)
+        a = np.where(left, a, x1)
+        x_new = np.where(left, b - GOLDEN * (b - a), a + GOLDEN * (b - a))
+        f_new = np.abs(f(x_new))
+        x1, x2 = np.where(left, x_new, x2), np.where(left, x1, x_new)
+        f1, f2 = np.where(left, f_new, f2), np.where(left, f1, f_new)
+    return (a + b) / 2
+
+
+def _grid_minimum(f, grid, n_iter):
+    """
+    Interior minimum of |f| on every row of grid, refined between neighbours.
+
+    :param grid: An (..., n) array of monotonic sample points.
+    :return: A tuple (x, relative, found): the refined location, |f(x)|
+             relative to the largest sample of the row, and a mask that is
+             False where the minimum lies on the first or last sample.
+    """
+    values = np.abs(f(grid))
+    j = np.argmin(values, axis=-1)
+    found = (j > 0) & (j < grid.shape[-1] - 1)
+    j = np.clip(j, 1, grid.shape[-1] - 2)[..., np.newaxis]
+    lo = np.take_along_axis(grid, j - 1, axis=-1)[..., 0]
+    hi = np.take_along_axis(grid, j + 1, axis=-1)[..., 0]
+    x = _refine_minimum(lambda t: f(t[..., np.newaxis])[..., 0], lo, hi, n_iter)
+    scale = values.max(axis=-1)
+    relative = np.abs(f(x[..., np.newaxis])[..., 0]) / np.where(scale > 0, scale, 1.0)
+    return x, relative, found
+
+
+def characteristic_roots(rho1, cP1, cS1, rho2, cP2, cS2, fluid1=False, fluid2=False,
+                         n_grid=256, n_iter=60, tol=1e-6):
+    """
+    Critical, Rayleigh and interface-wave conditions for a batch of pairs.
+
+    Unlike calculate_critical_angles, angles that do not exist are NaN
+    rather than clamped to 90.
+
+    :param fluid1: True if medium 1 is a fluid (shared by the whole batch).
+    :param fluid2: True if medium 2 is a fluid (shared by the whole batch).
+    :param n_grid: Samples per search interval.
+    :param n_iter: Golden-section iterations of the refinement.
+    :param tol: Largest relative |det| accepted as an interface-wave root.
+    :return: A dict of arrays with the broadcast shape of the parameters:
+             'critical_p', 'critical_s': critical angles (in degrees),
+             'rayleigh': leaky Rayleigh angle (in degrees),
+             'rayleigh_velocity': its phase velocity (in m/s),
+             'interface_velocity': Scholte/Stoneley velocity (in m/s).
+    """
+    rho1, cP1, cS1, rho2, cP2, cS2 = np.broadcast_arrays(rho1, cP1, cS1, rho2, cP2, cS2)
+    shape = rho1.shape
+    vP1, vS1, vP2, vS2 = (np.real(c).astype(float) for c in (cP1, cS1, cP2, cS2))
+
+    def det(p):
+        e = (Ellipsis, np.newaxis)
+        return boundary_determinant(p, rho1[e], cP1[e], cS1[e], rho2[e], cP2[e], cS2[e],
+                                    fluid1, fluid2)
+
+    def angle(c):
+        ratio = vP1 / c
+        return np.where(ratio <= 1, np.degrees(np.arcsin(np.minimum(ratio, 1))), np.nan)
+
+    result = {'critical_p': angle(vP2),
+              'critical_s': np.full(shape, np.nan) if fluid2 else angle(vS2),
+              'rayleigh': np.full(shape, np.nan),
+              'rayleigh_velocity': np.full(shape, np.nan),
+              'interface_velocity': np.full(shape, np.nan)}
+
+    u = np.linspace(0.0, 1.0, n_grid + 2)[1:-1]
+
+    # 1. 漏 Rayleigh 角：横波临界角与掠入射之间 |det| 的极小值
+    if not fluid2:
+        leaky = vP1 < vS2
+        p_lo = 1 / vS2[..., np.newaxis]
+        p_hi = 1 / vP1[..., np.newaxis]
+        p, _, found = _grid_minimum(det, p_lo + (p_hi - p_lo) * u, n_iter)
+        found &= leaky
+        result['rayleigh_velocity'] = np.where(found, 1 / p, np.nan)
+        result['rayleigh'] = np.where(found, np.degrees(np.arcsin(np.minimum(vP1 * p, 1))),
+                                      np.nan)
+
+    # 2. 界面波：慢于所有体波，det 在实轴上有真正的零点
+    if not (fluid1 and fluid2):
+        speeds = [vP1, vP2]
+        speeds += [] if fluid1 else [vS1]
+        speeds += [] if fluid2 else [vS2]
+        c_min = np.minimum.reduce(speeds)[..., np.newaxis]
+        # 速度网格在 c_min 附近加密（Scholte 波常紧贴流体声速）
+        c = c_min * (1 - 0.95 * u[::-1]**2)
+        p, relative, found = _grid_minimum(det, 1 / c, n_iter)
+        found &= relative < tol
+        result['interface_velocity'] = np.where(found, 1 / p, np.nan)
+    return result
@@ -0,0 +1,143 @@
+"""
+Local incidence on curved interfaces given as surface meshes.
+
+RT_Cal_v2 describes a flat interface at one incidence angle. A curved or
+stepped specimen surface is split into triangular facets; for a probe at a
+given position every facet sees the beam under its own local incidence
+angle (between the ray from the probe to the facet centroid and the facet
+normal). The angles of all facets are computed with array operations and
+the coefficients are read from an RT_Table of the material pair in one
+batched lookup, so meshes of 10^5–10^6 facets take well under a second.
+
+Facet normals follow the vertex order (counter-clockwise seen from the
+coupling side, where the probe is). Facets seen from behind are not
+insonified; shadowing of one part of the surface by another is not
+modelled.
+"""
+
+import numpy as np
+
+from RT_Cal_v2 import RT_Cal_v2
+from RT_Table import RT_Table
+
+
+def facet_geometry(vertices, faces):
+    """
+    Centroids, unit normals and areas of a triangle mesh.
+
+    :param vertices: (V, 3) vertex coordinates (in m).
+    :param faces: (F, 3) vertex indices of every triangle.
+    :return: A tuple (centroids (F, 3), normals (F, 3), areas (F,)).
+    """
+    v0, v1, v2 = (np.asarray(vertices, dtype=float)[np.asarray(faces)[:, i]] for i in range(3))
+    cross = np.cross(v1 - v0, v2 - v0)
+    double_area = np.linalg.norm(cross, axis=-1)
+    normals = np.divide(cross, double_area[:, np.newaxis], out=np.zeros_like(cross),
+                        where=double_area[:, np.newaxis] > 0)
+    return (v0 + v1 + v2) / 3, normals, double_area / 2
+
+
+def parametric_mesh(surface, u, v):
+    """
+    Triangulate a parametric surface over a (u, v) grid.
+
+    :param surface: Function mapping the (nu, nv) arrays U, V to a tuple of
+                    coordinate arrays (X, Y, Z), e.g. a cylinder along z
+                    lambda U, V: (R * np.sin(V), R * np.cos(V), U). The
+                    facet normals point along ∂/∂u × ∂/∂v (outwards in
+                    this example).
+    :param u: 1-D array of nu parameter values.
+    :param v: 1-D array of nv parameter values.
+    :return: A tuple (vertices (nu * nv, 3), faces (2 (nu - 1)(nv - 1), 3)).
+    """
+    U, V = np.meshgrid(u, v, indexing='ij')
+    vertices = np.stack([np.broadcast_to(c, U.shape) for c in surface(U, V)],
+                        axis=-1).reshape(-1, 3)
+    nu, nv = U.shape
+    index = np.arange(nu * nv).reshape(nu, nv)
+    a, b = index[:-1, :-1].ravel(), index[1:, :-1].ravel()
+    c, d = index[1:, 1:].ravel(), index[:-1, 1:].ravel()
+    # 每个网格四边形拆成两个三角形
+    faces = np.concatenate([np.stack([a, b, c], axis=-1), np.stack([a, c, d], axis=-1)])
+    return vertices, faces
+
+
+class RT_Surface:
+    """
+    A class for the transmitted energy over a meshed interface between two materials.
+    """
+
+    def __init__(self, material1, material2, n_nodes=256, table=None):
+        """
+        Initialize with the material pair; the coefficient table is built once.
+
+        :param material1: Coupling Material (probe side).
+        :param material2: Specimen Material.
+        :param n_nodes: Nodes per segment of the RT_Table.
+        :param table: An existing RT_Table of the pair, e.g. from RT_Table.load();
+                      ValueError if it was built for other material parameters.
+        """
+        self.material1 = material1
+        self.material2 = material2
+        rt_cal = RT_Cal_v2(material1, material2)
+        if table is not None:
+            table.check(rt_cal)
+        self.table = table or RT_Table.build(rt_cal, n_nodes)
+
+    def calculate_incidence(self, centroids, normals, probe):
+        """
+        Local incidence angle of the ray from the probe to every facet.
+
+        :param probe: Probe position (3,) (in m).
+        :return: A tuple (angles (F,) in degrees, NaN for facets seen from
+                 behind, unit ray directions (F, 3), distances (F,)).
+        """
+        ray = centroids - np.asarray(probe, dtype=float)
+        distance = np.linalg.norm(ray, axis=-1)
+        ray /= distance[:, np.newaxis]
+        cos_inc = -np.einsum('ij,ij->i', ray, normals)
+        angles = np.degrees(np.arccos(np.clip(cos_inc, 0.0, 1.0)))
+        return np.where(cos_inc > 0, angles, np.nan), ray, distance
+
+    def calculate_transmission_map(self, vertices, faces, probe, direction, half_angle=None):
+        """
+        Coefficients and transmitted energy on every facet for one probe position.
+
+        The probe is a point source with a Gaussian beam: the intensity at
+        off-axis angle ψ is exp(-ln 2 (ψ / half_angle)^2) / r², so
+        half_angle is the half-power half-angle. The energy incident on a
+        facet is this intensity times the facet's projected area.
+
+        :param vertices: (V, 3) vertex coordinates (in m).
+        :param faces: (F, 3) vertex indices of every triangle.
+        :param probe: Probe position (3,) (in m).
+        :param direction: Beam axis (3,).
+        :param half_angle: Beam half-angle (in degrees); None for an
+                           omnidirectional source.
+        :return: A dict of (F,) arrays: 'angle' (local incidence in
+                 degrees), 'R_P', 'R_S', 'T_P', 'T_S', 'incident' and
+                 'transmitted' (= incident · (T_P + T_S)); facets seen from
+                 behind have angle NaN and zero energies.
+        """
+        centroids, normals, areas = facet_geometry(vertices, faces)
+        angles, ray, distance = self.calculate_incidence(centroids, normals, probe)
+        lit = np.isfinite(angles)
+
+        # 所有被照射的面元一次批量查表
+        coeffs = {key: np.zeros(len(angles)) for key in ('R_P', 'R_S', 'T_P', 'T_S')}
+        for key, value in self.table.calculate_intensity_coef_batch(angles[lit]).items():
+            coeffs[key][lit] = value
+
+        axis = np.asarray(direction, dtype=float)
+        axis = axis / np.linalg.norm(axis)
+        directivity = np.ones(len(angles))
+        if half_angle is not None:
+            off_axis = np.degrees(np.arccos(np.clip(ray @ axis, -1.0, 1.0)))
+            directivity = np.exp(-np.log(2) * (off_axis / half_angle)**2)
+        cos_inc = np.cos(np.radians(np.where(lit, angles, 90.0)))
+        incident = np.where(lit, directivity * areas * cos_inc / distance**2, 0.0)
+
+        coeffs['angle'] = angles
+        coeffs['incident'] = incident
+        coeffs['transmitted'] = incident * (coeffs['T_P'] + coeffs['T_S'])
+        return coeffs
@@ -0,0 +1,207 @@
+"""
+Design-space sweep of hypothetical coupling media.
+
+new_impedance.py and main_plot_m.py rank the discrete materials of
+materials.json. This module instead scans a dense (density, vp, vs) grid of
+coupling media against one fixed substrate: for every grid point the energy
+coefficients are evaluated over the whole angle grid and only the peak of
+every coefficient over angle (and the angle where it occurs) is kept. The
+coefficients come from RT_Multilayer.interface_coefficients, which only
+carries the waves that exist for every solid/fluid combination.
+
+The grid is split into chunks of flat point indices that are evaluated on a
+process pool; the reduced results are streamed into .npy memmaps, so a
+200³ grid needs no more RAM than one chunk per worker. Optima and
+iso-transmission contours are read back slab by slab.
+
+On Windows, call RT_Sweep.run from under an ``if __name__ == '__main__'``
+guard, as required by multiprocessing.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Material import require_isotropic
+from RT_Cal_v2 import COEFFICIENT_KEYS
+from RT_Multilayer import interface_coefficients
+
+# 泊松比 > -1 要求 vs/vp < √3/2，超出部分视为非物理点（结果为 NaN）
+MAX_VS_VP_RATIO = np.sqrt(3) / 2
+
+
+def _sweep_chunk(task):
+    """
+    Peak coefficients of the grid points [start, stop) (runs in a worker).
+
+    Points with vs == 0 are treated as fluids.
+    """
+    start, stop, (density, vp, vs), substrate, angles_inc = task
+    rho2, cP2, cS2, fluid2 = substrate
+    i, j, k = np.unravel_index(np.arange(start, stop), (density.size, vp.size, vs.size))
+    rho1, cP1, cS1 = density[i, np.newaxis], vp[j, np.newaxis], vs[k, np.newaxis] + 0j
+    theta_P1 = np.deg2rad(angles_inc)
+
+    n = stop - start
+    peak = np.full((n, 4), np.nan, dtype=np.float32)
+    peak_angle = np.full((n, 4), np.nan, dtype=np.float32)
+    physical = (vs[k] >= 0) & (vs[k] < MAX_VS_VP_RATIO * vp[j])
+    fluid1 = vs[k] == 0
+
+    for mask, is_fluid in ((physical & ~fluid1, False), (physical & fluid1, True)):
+        if not mask.any():
+            continue
+        # 固-固也用位移/应力方程组（能量守恒），不用 RT_Cal_v2 的角度 4x4 核
+        coeffs = interface_coefficients(theta_P1, rho1[mask], cP1[mask], cS1[mask],
+                                        rho2, cP2, cS2, is_fluid, fluid2)
+        values = np.stack([coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+        values = np.where(np.isfinite(values), values, -np.inf)
+        best = np.argmax(values, axis=1)
+        best_value = np.take_along_axis(values, best[:, np.newaxis, :], axis=1)[:, 0]
+        valid = np.isfinite(best_value)
+        peak[mask] = np.where(valid, best_value, np.nan)
+        peak_angle[mask] = np.where(valid, angles_inc[best], np.nan)
+    return start, peak, peak_angle
+
+
+class RT_Sweep:
+    """
+    Peak energy coefficients over a (density, vp, vs) grid of coupling media.
+
+    peak[i, j, k, c] is the largest value of coefficient c (COEFFICIENT_KEYS
+    order) over the angle grid for the medium (density[i], vp[j], vs[k]);
+    peak_angle holds the incidence angle (in degrees) where it occurs.
+    """
+
+    def __init__(self, path, density, vp, vs, angles, substrate=''):
+        """
+        Initialize from the arrays of a sweep directory; use run() or open().
+
+        :param path: Directory holding peak.npy and peak_angle.npy.
+        :param substrate: Name of the substrate material.
+        """
+        self.path = path
+        self.density = np.asarray(density, dtype=float)
+        self.vp = np.asarray(vp, dtype=float)
+        self.vs = np.asarray(vs, dtype=float)
+        self.angles = np.asarray(angles, dtype=float)
+        self.substrate = substrate
+        self.shape = (self.density.size, self.vp.size, self.vs.size)
+        self.peak = np.load(os.path.join(path, 'peak.npy'), mmap_mode='r')
+        self.peak_angle = np.load(os.path.join(path, 'peak_angle.npy'), mmap_mode='r')
+
+    @classmethod
+    def run(cls, substrate, density, vp, vs, angles_inc, path, chunk_size=2048,
+            n_workers=None):
+        """
+        Evaluate the grid and write the results to the directory path.
+
+        :param substrate: The transmission Material.
+        :param density: 1-D grid of coupling-medium densities (in kg/m^3).
+        :param vp: 1-D grid of P-wave velocities (in m/s).
+        :param vs: 1-D grid of S-wave velocities (in m/s); 0 means fluid.
+        :param angles_inc: 1-D grid of incidence angles (in degrees).
+        :param chunk_size: Grid points per task; memory per worker grows
+                           with chunk_size * len(angles_inc).
+        :param n_workers: Worker processes; None uses all cores, 1 runs in
+                          this process.
+        :return: A RT_Sweep backed by the written files.
+        """
+        require_isotropic('RT_Sweep.run', substrate)
+        axes = tuple(np.asarray(a, dtype=float) for a in (density, vp, vs))
+        angles_inc = np.asarray(angles_inc, dtype=float)
+        shape = tuple(a.size for a in axes)
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, 'axes.npz'), density=axes[0], vp=axes[1], vs=axes[2],
+                 angles=angles_inc, substrate=np.array(substrate.name))
+
+        peak = np.lib.format.open_memmap(os.path.join(path, 'peak.npy'), mode='w+',
+                                         dtype=np.float32, shape=shape + (4,))
+        peak_angle = np.lib.format.open_memmap(os.path.join(path, 'peak_angle.npy'),
+                                               mode='w+', dtype=np.float32,
+                                               shape=shape + (4,))
+        flat_peak = peak.reshape(-1, 4)
+        flat_angle = peak_angle.reshape(-1, 4)
+
+        params = (substrate.density, substrate.vp, complex(substrate.vs), substrate.is_fluid)
+        total = int(np.prod(shape))
+        tasks = ((start, min(start + chunk_size, total), axes, params, angles_inc)
+                 for start in range(0, total, chunk_size))
+
+        def store(results):
+            for start, chunk_peak, chunk_angle in results:
+                flat_peak[start:start + len(chunk_peak)] = chunk_peak
+                flat_angle[start:start + len(chunk_angle)] = chunk_angle
+
+        if n_workers == 1:
+            store(map(_sweep_chunk, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                store(pool.map(_sweep_chunk, tasks))
+
+        peak.flush()
+        peak_angle.flush()
+        del peak, peak_angle, flat_peak, flat_angle
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a sweep directory written by run(); the results stay on disk.
+        """
+        with np.load(os.path.join(path, 'axes.npz')) as data:
+            return cls(path, data['density'], data['vp'], data['vs'], data['angles'],
+                       str(data['substrate']))
+
+    def optima(self, keys=('T_P', 'T_S'), slab=8):
+        """
+        Grid point with the largest peak of every requested coefficient.
+
+        The memmap is scanned slab by slab along the density axis.
+
+        :param slab: Density planes read per step.
+        :return: A dict key -> {'value', 'density', 'vp', 'vs', 'angle'}.
+        """
+        columns = [COEFFICIENT_KEYS.index(key) for key in keys]
+        best = {key: (-np.inf, None) for key in keys}
+        for start in range(0, self.shape[0], slab):
+            block = np.asarray(self.peak[start:start + slab][..., columns], dtype=float)
+            block = np.where(np.isnan(block), -np.inf, block)
+            flat = block.reshape(-1, len(columns))
+            arg = np.argmax(flat, axis=0)
+            for c, key in enumerate(keys):
+                value = flat[arg[c], c]
+                if value > best[key][0]:
+                    i, j, k = np.unravel_index(arg[c], block.shape[:3])
+                    best[key] = (value, (start + i, j, k))
+
+        result = {}
+        for c, key in enumerate(keys):
+            value, index = best[key]
+            if index is None:
+                result[key] = None
+                continue
+            i, j, k = index
+            result[key] = {'value': float(value),
+                           'density': float(self.density[i]),
+                           'vp': float(self.vp[j]),
+                           'vs': float(self.vs[k]),
+                           'angle': float(self.peak_angle[i, j, k, columns[c]])}
+        return result
+
+    def iso_contours(self, key, level, vs):
+        """
+        Iso-transmission lines of a peak coefficient in the (density, vp) plane.
+
+        :param key: Coefficient, e.g. 'T_S'.
+        :param level: Contour level of the peak coefficient.
+        :param vs: S-wave velocity of the slice; the nearest grid value is used.
+        :return: A list of (n, 2) arrays with columns (density, vp).
+        """
+        import contourpy
+
+        k = int(np.argmin(np.abs(self.vs - vs)))
+        z = np.asarray(self.peak[:, :, k, COEFFICIENT_KEYS.index(key)], dtype=float)
+        generator = contourpy.contour_generator(x=self.vp, y=self.density, z=z)
+        return [line[:, ::-1] for line in generator.lines(level)]
@@ -0,0 +1,176 @@
+"""
+Precomputed interpolation tables for RT_Cal_v2 energy coefficients.
+
+For a fixed material pair the coefficient curves are smooth between the
+critical-angle breakpoints, so each segment is sampled once and served by a
+monotone cubic Hermite interpolant. Inside a segment the nodes are clustered
+towards both ends (angle = a + (b - a)(1 - cos πu)/2 with u uniform), which
+turns the square-root behaviour at a critical angle into a smooth function
+of u. A lookup is a constant number of array operations per query.
+
+The interpolation error is largest right next to the critical angles. For
+the bundled material pairs it stays below 4e-3 with the default 256 nodes
+per segment and drops about tenfold per doubling of n_nodes; elsewhere it
+is typically below 1e-5.
+
+Tables are stored in float64 as compressed .npz files together with the
+material parameters of the pair, which load() can check against a
+RT_Cal_v2 instance.
+"""
+
+import numpy as np
+
+from RT_Cal_v2 import COEFFICIENT_KEYS
+from RT_Adaptive import characteristic_angles
+
+
+def _monotone_slopes(values, h):
+    # Fritsch–Carlson 单调斜率，沿节点轴（倒数第二轴）向量化
+    delta = np.diff(values, axis=-2) / h
+    slopes = np.zeros_like(values)
+    d0, d1 = delta[..., :-1, :], delta[..., 1:, :]
+    same_sign = d0 * d1 > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = np.where(same_sign, 2 * d0 * d1 / (d0 + d1), 0.0)
+    slopes[..., 1:-1, :] = harmonic
+    slopes[..., 0, :] = delta[..., 0, :]
+    slopes[..., -1, :] = delta[..., -1, :]
+    return slopes
+
+
+class RT_Table:
+    """
+    A lookup table with the same interface as RT_Cal_v2.calculate_intensity_coef.
+    """
+
+    def __init__(self, breakpoints, values, slopes, critical_angles, params=None, name=''):
+        """
+        Initialize the table from precomputed arrays; use build() or load().
+
+        :param breakpoints: Segment boundaries (in degrees), shape (S + 1,).
+        :param values: Coefficients at the nodes, shape (S, n, 4).
+        :param slopes: Derivatives d(value)/du at the nodes, shape (S, n, 4).
+        :param critical_angles: (critical_angle_p, critical_angle_s) of the pair.
+        :param params: Material parameters the table was built from.
+        :param name: Label of the material pair.
+        """
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.slopes = np.asarray(slopes, dtype=float)
+        self.critical_angles = tuple(float(a) for a in critical_angles)
+        self.params = params
+        self.name = name
+        self.n_nodes = self.values.shape[1]
+
+    @classmethod
+    def build(cls, rt_cal, n_nodes=256, angle_max=90.0, backend='solve'):
+        """
+        Sample every segment of rt_cal once and build the interpolants.
+
+        :param rt_cal: A RT_Cal_v2 instance.
+        :param n_nodes: Nodes per segment.
+        :param angle_max: Upper end of the tabulated range (in degrees).
+        :return: A RT_Table.
+        """
+        special = characteristic_angles(rt_cal)
+        special = special[(special > 0) & (special < angle_max)]
+        breakpoints = np.unique(np.concatenate([[0.0], special, [angle_max]]))
+
+        u = np.linspace(0.0, 1.0, n_nodes)
+        s = (1 - np.cos(np.pi * u)) / 2
+        a, b = breakpoints[:-1, np.newaxis], breakpoints[1:, np.newaxis]
+        nodes = a + (b - a) * s
+
+        coeffs = rt_cal.calculate_intensity_coef_batch(nodes, backend=backend)
+        values = np.stack([coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+        slopes = _monotone_slopes(values, u[1] - u[0])
+
+        name = f"{rt_cal.material1.name}/{rt_cal.material2.name}"
+        params = np.array(rt_cal._material_parameters(), dtype=np.complex128)
+        return cls(breakpoints, values, slopes, rt_cal.calculate_critical_angles(),
+                   params, name)
+
+    def save(self, path):
+        """
+        Write the table to a compressed .npz file.
+        """
+        np.savez_compressed(path, breakpoints=self.breakpoints,
+                            values=self.values, slopes=self.slopes,
+                            critical_angles=np.array(self.critical_angles),
+                            params=np.asarray(self.params, dtype=np.complex128),
+                            name=np.array(self.name))
+
+    @classmethod
+    def load(cls, path, rt_cal=None):
+        """
+        Read a table written by save().
+
+        :param path: The .npz file.
+        :param rt_cal: Optional RT_Cal_v2 instance the table must belong to,
+                       see check().
+        :return: A RT_Table.
+        """
+        with np.load(path) as data:
+            table = cls(data['breakpoints'], data['values'], data['slopes'],
+                        data['critical_angles'], data['params'], str(data['name']))
+        if rt_cal is not None:
+            table.check(rt_cal)
+        return table
+
+    def check(self, rt_cal):
+        """
+        Raise ValueError unless the table was built for the pair of rt_cal.
+
+        :param rt_cal: A RT_Cal_v2 instance.
+        """
+        expected = np.array(rt_cal._material_parameters(), dtype=np.complex128)
+        if self.params is None or not np.array_equal(np.asarray(self.params), expected):
+            raise ValueError(f"Table {self.name!r} was built for the material parameters "
+                             f"{self.params}, not those of "
+                             f"{rt_cal.material1.name}/{rt_cal.material2.name} {expected}")
+
+    def calculate_critical_angles(self):
+        return self.critical_angles
+
+    def calculate_intensity_coef(self, angle_inc):
+        """
+        Interpolated energy coefficients at one incidence angle (in degrees).
+
+        :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'.
+        """
+        coeffs = self.calculate_intensity_coef_batch(np.array([angle_inc]))
+        return {key: value[0] for key, value in coeffs.items()}
+
+    def calculate_intensity_coef_batch(self, angles_inc):
+        """
+        Interpolated energy coefficients for an array of angles (in degrees).
+
+        Angles outside the tabulated range are clamped to it.
+
+        :return: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S'; each value has
+                 the shape of angles_inc.
+        """
+        angles = np.asarray(angles_inc, dtype=float)
+        bp = self.breakpoints
+        angles = np.clip(angles, bp[0], bp[-1])
+
+        seg = np.clip(np.searchsorted(bp, angles, side='right') - 1, 0, bp.size - 2)
+        a, b = bp[seg], bp[seg + 1]
+        s = np.clip((angles - a) / (b - a), 0.0, 1.0)
+        u = np.arccos(1 - 2 * s) / np.pi
+
+        h = 1.0 / (self.n_nodes - 1)
+        i = np.minimum((u / h).astype(np.intp), self.n_nodes - 2)
+        t = (u - i * h) / h
+
+        # 三次 Hermite 基函数
+        t2, t3 = t * t, t * t * t
+        h00 = (2 * t3 - 3 * t2 + 1)[..., np.newaxis]
+        h10 = (t3 - 2 * t2 + t)[..., np.newaxis]
+        h01 = (-2 * t3 + 3 * t2)[..., np.newaxis]
+        h11 = (t3 - t2)[..., np.newaxis]
+
+        y0, y1 = self.values[seg, i], self.values[seg, i + 1]
+        m0, m1 = self.slopes[seg, i], self.slopes[seg, i + 1]
+        result = h00 * y0 + h10 * h * m0 + h01 * y1 + h11 * h * m1
+        return {key: result[..., k] for k, key in enumerate(COEFFICIENT_KEYS)}
@@ -0,0 +1,62 @@
+"""
+Energy-conservation check for batched coefficient sweeps.
+
+For lossless media the energy coefficients must satisfy
+R_P + R_S + T_P + T_S = 1. The check works on any batched output of the
+solver: a dict of coefficient arrays (RT_Cal_v2) or an array with the four
+coefficients along the last axis (RT_Pairs). It only adds a sum and a
+comparison per point, so it can stay enabled in production sweeps.
+"""
+
+import numpy as np
+
+from RT_Cal_v2 import COEFFICIENT_KEYS
+
+
+def energy_residual(coeffs):
+    """
+    Signed residual R_P + R_S + T_P + T_S - 1 at every point.
+
+    :param coeffs: A dict with keys 'R_P', 'R_S', 'T_P', 'T_S', or an array
+                   with the coefficients along the last axis.
+    :return: A float array with the batch shape.
+    """
+    if isinstance(coeffs, dict):
+        total = coeffs[COEFFICIENT_KEYS[0]].copy()
+        for key in COEFFICIENT_KEYS[1:]:
+            total += coeffs[key]
+    else:
+        total = np.sum(coeffs, axis=-1)
+    total -= 1.0
+    return total
+
+
+def validate_energy(coeffs, tol=1e-3):
+    """
+    Flag points that violate energy conservation by more than tol.
+
+    Non-finite results (singular systems) are always flagged.
+
+    :param coeffs: A dict of coefficient arrays or a (..., 4) array.
+    :param tol: Allowed absolute residual.
+    :return: A dict with
+             'residual': the signed residual at every point,
+             'violations': boolean mask of flagged points,
+             'indices': (n, ndim) array of flagged indices,
+             'n_violations': number of flagged points,
+             'max_residual': largest finite |residual|.
+    """
+    residual = energy_residual(coeffs)
+    abs_residual = np.abs(residual)
+    # 非有限值（NaN/inf）比较结果为 False，需单独标记
+    violations = ~(abs_residual <= tol)
+    n_violations = int(np.count_nonzero(violations))
+    finite = abs_residual[np.isfinite(abs_residual)]
+    return {
+        'residual': residual,
+        'violations': violations,
+        'indices': np.argwhere(violations) if n_violations else
+                   np.empty((0, residual.ndim), dtype=np.intp),
+        'n_violations': n_violations,
+        'max_residual': float(finite.max()) if finite.size else float('nan'),
+    }
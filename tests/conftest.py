@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Material import load_materials  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def materials():
+    return {mat.name: mat for mat in load_materials(os.path.join(ROOT, 'materials.json'))}
@@ -0,0 +1,49 @@
+import numpy as np
+
+from RT_Adaptive import adaptive_intensity_sweep, characteristic_angles
+from RT_Cal_v2 import RT_Cal_v2, rayleigh_velocity
+from RT_Roots import characteristic_roots
+
+
+def _roots(material1, material2):
+    return characteristic_roots(material1.density, material1.vp, complex(material1.vs),
+                                material2.density, material2.vp, complex(material2.vs),
+                                material1.is_fluid, material2.is_fluid)
+
+
+def test_breakpoints_of_fluid_solid_pair(materials):
+    water, aluminium = materials['water'], materials['aluminium']
+    angles = characteristic_angles(RT_Cal_v2(water, aluminium))
+    critical_p, critical_s = RT_Cal_v2(water, aluminium).calculate_critical_angles()
+    roots = _roots(water, aluminium)
+    np.testing.assert_allclose(angles, [critical_p, critical_s, roots['rayleigh']])
+
+
+def test_solid_pairs_use_leaky_rayleigh_angle(materials):
+    # 固-固界面：取界面方程组的漏 Rayleigh 角，而不是介质2自由表面的 Rayleigh 角
+    rexolite, steel = materials['rexolite'], materials['stainless steel347']
+    angles = characteristic_angles(RT_Cal_v2(rexolite, steel))
+    roots = _roots(rexolite, steel)
+    assert np.isfinite(roots['rayleigh'])
+    np.testing.assert_allclose(angles, [roots['critical_p'], roots['critical_s'],
+                                        roots['rayleigh']])
+    free_surface = np.degrees(np.arcsin(rexolite.vp / rayleigh_velocity(steel.vp, steel.vs)))
+    assert np.min(np.abs(angles - free_surface)) > 0.1
+
+
+def test_missing_breakpoints_are_left_out(materials):
+    ice, aluminium = materials['ice'], materials['aluminium']
+    assert characteristic_angles(RT_Cal_v2(aluminium, ice)).size == 0
+    # 冰的纵波速度高于铝的横波速度：只有纵波临界角
+    angles = characteristic_angles(RT_Cal_v2(ice, aluminium))
+    np.testing.assert_allclose(angles, np.degrees(np.arcsin(ice.vp / aluminium.vp)))
+
+
+def test_sweep_samples_breakpoints(materials):
+    rt_cal = RT_Cal_v2(materials['water'], materials['aluminium'])
+    angles, coeffs = adaptive_intensity_sweep(rt_cal, tol=1e-3)
+    for angle in characteristic_angles(rt_cal):
+        assert np.min(np.abs(angles - angle)) < 1e-9
+    exact = rt_cal.calculate_intensity_coef_batch(angles)
+    for key in exact:
+        np.testing.assert_allclose(coeffs[key], exact[key], atol=1e-12)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from Material import Material
+from RT_Anisotropic import (anisotropic_interface_coefficients, isotropic_stiffness,
+                            rotate_stiffness, transversely_isotropic_stiffness)
+from RT_Cache import RT_Cache
+from RT_Cal_v2 import RT_Cal_v2
+from RT_Multilayer import interface_scattering_matrix
+
+THETA = np.deg2rad(np.linspace(0.0, 90.0, 91))
+KEYS = ('R_P', 'R_S', 'T_P', 'T_S')
+
+
+def _composite(name='composite', tilt=0.0):
+    C = transversely_isotropic_stiffness(14e9, 0.6e9, 1.2e9, 0.5e9, 0.4e9)
+    return Material(name, 1600, 3000, 1500, stiffness=rotate_stiffness(C, tilt))
+
+
+def _isotropic_twin(material):
+    C = isotropic_stiffness(material.density, material.vp, np.real(material.vs))
+    return Material(material.name, material.density, material.vp, material.vs, stiffness=C)
+
+
+@pytest.mark.parametrize('name1, name2', [('water', 'aluminium'), ('ice', 'aluminium'),
+                                          ('aluminium', 'water')])
+def test_isotropic_limit(materials, name1, name2):
+    material1, material2 = materials[name1], materials[name2]
+    theta = THETA[:-1]
+    twins = [m if m.is_fluid else _isotropic_twin(m) for m in (material1, material2)]
+    coeffs = anisotropic_interface_coefficients(*twins, theta)
+    energy = interface_scattering_matrix(material1, material2,
+                                         np.sin(theta) / material1.vp)['energy']
+    for index, key in enumerate(KEYS):
+        assert np.allclose(coeffs[key], energy[..., index, 0], atol=1e-10)
+
+
+@pytest.mark.parametrize('tilt', [0.0, 30.0])
+@pytest.mark.parametrize('other', ['water', 'aluminium'])
+def test_energy_conservation(materials, tilt, other):
+    composite = _composite(tilt=tilt)
+    for pair in ((materials[other], composite), (composite, materials[other])):
+        coeffs = anisotropic_interface_coefficients(*pair, THETA)
+        assert np.allclose(sum(coeffs.values()), 1.0, atol=1e-10)
+
+
+def test_grazing_and_identical(materials):
+    coeffs = anisotropic_interface_coefficients(materials['water'], _composite(), np.pi / 2)
+    assert coeffs['R_P'] == pytest.approx(1.0)
+    coeffs = anisotropic_interface_coefficients(_composite(), _composite(), THETA)
+    assert np.allclose(coeffs['T_P'], 1.0)
+
+
+def test_cache_distinguishes_stiffness(materials):
+    aluminium = materials['aluminium']
+    twin = Material('ti', aluminium.density, aluminium.vp, aluminium.vs,
+                    stiffness=transversely_isotropic_stiffness(80e9, 40e9, 100e9, 20e9, 25e9))
+    cache = RT_Cache()
+    angles = np.linspace(0.0, 80.0, 9)
+    RT_Cal_v2(materials['water'], aluminium, cache).calculate_intensity_coef_batch(angles)
+    cached = RT_Cal_v2(materials['water'], twin, cache).calculate_intensity_coef_batch(angles)
+    direct = RT_Cal_v2(materials['water'], twin).calculate_intensity_coef_batch(angles)
+    for key in KEYS:
+        assert np.array_equal(cached[key], direct[key])
+
+
+def test_isotropic_only_paths_raise(materials):
+    rt_cal = RT_Cal_v2(materials['water'], _composite())
+    with pytest.raises(ValueError):
+        rt_cal.calculate_intensity_coef_temperature([100.0, 200.0], [10.0])
+    with pytest.raises(ValueError):
+        rt_cal.calculate_intensity_coef_spectrum([1e6, 2e6], [10.0])
+    with pytest.raises(ValueError):
+        rt_cal.calculate_intensity_sensitivities([10.0])
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from RT_Aperture import aperture_average
+from RT_Cal_v2 import COEFFICIENT_KEYS, RT_Cal_v2
+from RT_Pairs import RT_Pairs
+
+ANGLES = np.linspace(0.0, 85.0, 18)
+
+
+def test_aperture_tensor_conserves_energy(materials):
+    pairs = RT_Pairs(list(materials.values()))
+    tensor = pairs.calculate_aperture_tensor(ANGLES, 2.0)
+    assert np.all(tensor >= -1e-12) and np.all(tensor <= 1 + 1e-9)
+    np.testing.assert_allclose(tensor.sum(axis=-1), 1.0, atol=1e-9)
+
+
+def test_narrow_aperture_matches_single_angle(materials):
+    material1, material2 = materials['ice'], materials['aluminium']
+    angles = np.array([5.0, 20.0, 60.0])
+    averaged = aperture_average(material1, material2, angles, 1e-3)
+    exact = RT_Cal_v2(material1, material2).calculate_intensity_coef_batch(angles)
+    for key in COEFFICIENT_KEYS:
+        np.testing.assert_allclose(averaged[key], exact[key], atol=1e-6)
+
+
+def test_unknown_profile_raises(materials):
+    with pytest.raises(ValueError):
+        aperture_average(materials['ice'], materials['aluminium'], 10.0, 1.0, profile='box')
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from RT_Cache import RT_Cache
+from RT_Cal_v2 import RT_Cal_v2, intensity_coefficients
+
+ANGLES = np.linspace(0.0, 80.0, 17)
+
+
+def test_backends_are_cached_separately(materials, monkeypatch):
+    cache = RT_Cache()
+    rt_cal = RT_Cal_v2(materials['ice'], materials['aluminium'], cache)
+    calls = []
+
+    def recording(*args, backend='solve'):
+        calls.append(backend)
+        return intensity_coefficients(*args, backend=backend)
+
+    monkeypatch.setattr('RT_Cal_v2.intensity_coefficients', recording)
+    solve = rt_cal.calculate_intensity_coef_batch(ANGLES, backend='solve')
+    cramer = rt_cal.calculate_intensity_coef_batch(ANGLES, backend='cramer')
+    assert calls == ['solve', 'cramer']
+    assert cache.misses == 2 * ANGLES.size and len(cache) == 2 * ANGLES.size
+
+    again = rt_cal.calculate_intensity_coef_batch(ANGLES, backend='cramer')
+    assert calls == ['solve', 'cramer'] and cache.hits == ANGLES.size
+    for key in solve:
+        assert np.array_equal(again[key], cramer[key])
+        np.testing.assert_allclose(cramer[key], solve[key], rtol=1e-10, atol=1e-12)
+
+
+def test_cached_values_match_direct(materials):
+    water, aluminium = materials['water'], materials['aluminium']
+    cache = RT_Cache(max_size=8)
+    cached = RT_Cal_v2(water, aluminium, cache).calculate_intensity_coef_batch(ANGLES)
+    direct = RT_Cal_v2(water, aluminium).calculate_intensity_coef_batch(ANGLES)
+    for key in direct:
+        assert np.array_equal(cached[key], direct[key])
+    assert len(cache) == 8 and cache.evictions == ANGLES.size - 8
+
+
+def test_invalid_size_raises():
+    with pytest.raises(ValueError):
+        RT_Cache(max_size=0)
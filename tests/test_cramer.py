@@ -0,0 +1,38 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from RT_Cal_v2 import RT_Cal_v2, intensity_coefficients
+
+ANGLES = np.linspace(0.0, 89.0, 179)
+
+
+def _params(material1, material2):
+    return (material1.density, material1.vp, complex(material1.vs),
+            material2.density, material2.vp, complex(material2.vs))
+
+
+def _solids(materials):
+    return [material for material in materials.values() if not material.is_fluid]
+
+
+def test_cramer_matches_solve_for_all_solid_pairs(materials):
+    for material1, material2 in itertools.permutations(_solids(materials), 2):
+        difference = RT_Cal_v2(material1, material2).cross_check_backends(ANGLES)
+        assert np.nanmax(difference) < 1e-12, (material1.name, material2.name)
+
+
+def test_cramer_coefficients_match_solve(materials):
+    params = _params(materials['aluminium'], materials['stainless steel347'])
+    theta = np.deg2rad(ANGLES)
+    solve = intensity_coefficients(theta, *params, backend='solve')
+    cramer = intensity_coefficients(theta, *params, backend='cramer')
+    for key in solve:
+        np.testing.assert_allclose(cramer[key], solve[key], rtol=1e-10, atol=1e-12)
+
+
+def test_unknown_backend_raises(materials):
+    params = _params(materials['aluminium'], materials['ice'])
+    with pytest.raises(ValueError):
+        intensity_coefficients(np.deg2rad(ANGLES), *params, backend='qr')
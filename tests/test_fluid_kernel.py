@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from Material import Material
+from RT_Cal_v2 import RT_Cal_v2
+from RT_Multilayer import interface_coefficients, interface_scattering_matrix
+from RT_Pairs import RT_Pairs
+from RT_Table import RT_Table
+
+ANGLES = np.linspace(0.0, 90.0, 91)
+FLUID_PAIRS = [('water', 'aluminium'), ('aluminium', 'water'), ('water', 'wax'),
+               ('water', 'water'), ('wax', 'water')]
+
+
+@pytest.mark.parametrize('name1, name2', FLUID_PAIRS)
+def test_energy_conservation(materials, name1, name2):
+    coeffs = RT_Cal_v2(materials[name1], materials[name2]).calculate_intensity_coef_batch(ANGLES)
+    assert np.allclose(sum(coeffs.values()), 1.0, atol=1e-10)
+
+
+@pytest.mark.parametrize('name2', ['aluminium', 'ice'])
+def test_attenuating_substrate_conserves_energy(materials, name2):
+    # 非均匀透射波之间的干涉能流计入 T
+    water, solid = materials['water'], materials[name2]
+    lossy = Material(solid.name, solid.density, solid.vp, solid.vs, alpha_p=5.0, alpha_s=10.0)
+    coeffs = RT_Cal_v2(water, lossy).calculate_intensity_coef_spectrum([1e6, 5e6], ANGLES[:-1])
+    assert np.allclose(sum(coeffs.values()), 1.0, atol=1e-10)
+    assert coeffs['T_P'][0, 40] > 0 and coeffs['T_S'][0, 40] > 0
+
+
+def test_attenuation_vanishes_in_lossless_limit(materials):
+    water, aluminium = materials['water'], materials['aluminium']
+    lossy = Material('aluminium', aluminium.density, aluminium.vp, aluminium.vs,
+                     alpha_p=1e-6, alpha_s=1e-6)
+    coeffs = RT_Cal_v2(water, lossy).calculate_intensity_coef_spectrum([5e6], ANGLES[:-1])
+    lossless = RT_Cal_v2(water, aluminium).calculate_intensity_coef_batch(ANGLES[:-1])
+    for key in coeffs:
+        np.testing.assert_allclose(coeffs[key][0], lossless[key], atol=1e-6)
+
+
+def test_normal_incidence_impedance(materials):
+    water, aluminium = materials['water'], materials['aluminium']
+    Z1, Z2 = water.density * water.vp, aluminium.density * aluminium.vp
+    coeffs = RT_Cal_v2(water, aluminium).calculate_intensity_coef(0.0)
+    assert coeffs['R_P'] == pytest.approx(((Z2 - Z1) / (Z2 + Z1))**2)
+    assert coeffs['T_P'] == pytest.approx(4 * Z1 * Z2 / (Z1 + Z2)**2)
+
+
+@pytest.mark.parametrize('name', ['water', 'wax', 'aluminium'])
+def test_identical_media_transmit_everything(materials, name):
+    coeffs = RT_Cal_v2(materials[name], materials[name]).calculate_intensity_coef_batch(ANGLES)
+    assert np.allclose(coeffs['T_P'], 1.0)
+    assert np.allclose(coeffs['R_P'], 0.0)
+
+
+@pytest.mark.parametrize('name1, name2', FLUID_PAIRS[:3])
+def test_grazing_incidence_is_total_reflection(materials, name1, name2):
+    coeffs = RT_Cal_v2(materials[name1], materials[name2]).calculate_intensity_coef(90.0)
+    assert coeffs['R_P'] == pytest.approx(1.0)
+
+
+def test_grazing_test_is_per_angle():
+    args = (1000.0, 1480.0, 0j, 2700.0, 6300.0, 3100.0 + 0j, True, False)
+    alone = interface_coefficients(np.deg2rad(89.0), *args)
+    batch = interface_coefficients(np.deg2rad(np.array([89.0, 10.0])), *args)
+    assert batch['R_P'][0] == pytest.approx(float(alone['R_P']), rel=1e-12)
+
+
+def test_matches_scattering_matrix(materials):
+    water, aluminium = materials['water'], materials['aluminium']
+    theta = np.deg2rad(np.linspace(1.0, 89.0, 45))
+    energy = interface_scattering_matrix(water, aluminium, np.sin(theta) / water.vp)['energy']
+    coeffs = RT_Cal_v2(water, aluminium).calculate_intensity_coef_batch(np.degrees(theta))
+    for index, key in ((0, 'R_P'), (2, 'T_P'), (3, 'T_S')):
+        assert np.allclose(coeffs[key], energy[..., index, 0], atol=1e-10)
+
+
+def test_pairs_and_table_include_grazing(materials):
+    tensor = RT_Pairs(list(materials.values())).calculate_intensity_tensor(ANGLES)
+    fluid = np.array([mat.is_fluid for mat in materials.values()])
+    assert np.isfinite(tensor[fluid]).all() and np.isfinite(tensor[:, fluid]).all()
+    table = RT_Table.build(RT_Cal_v2(materials['water'], materials['water']))
+    assert table.calculate_intensity_coef_batch(np.array([90.0]))['T_P'][0] == pytest.approx(1.0)
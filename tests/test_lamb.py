@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from RT_Cal_v2 import RT_Cal_v2
+from RT_Lamb import RT_Lamb, incidence_angles, lamb_determinant
+
+MHZ_MM = 1e3  # 1 MHz·mm = 1000 Hz·m
+
+
+@pytest.fixture(scope='module')
+def aluminium_plate(materials):
+    return RT_Lamb(materials['aluminium'])
+
+
+def _plate_velocity(lamb):
+    return 2 * lamb.vs * np.sqrt(1 - (lamb.vs / lamb.vp)**2)
+
+
+def test_s0_tends_to_plate_velocity(aluminium_plate):
+    dispersion = aluminium_plate.calculate_dispersion(np.array([0.001, 0.01]) * MHZ_MM,
+                                                      n_workers=1)
+    s0 = dispersion['symmetric'][:, 0]
+    np.testing.assert_allclose(s0, _plate_velocity(aluminium_plate), rtol=1e-5)
+
+
+def test_a0_vanishes_as_flexural_wave(aluminium_plate):
+    # 低频弯曲波：c = sqrt(π·fd·c_plate/√3)，fd → 0 时趋于 0
+    fd = np.array([0.0001, 0.001, 0.01]) * MHZ_MM
+    c_grid = np.geomspace(1.0, 4 * aluminium_plate.vp, 8192)
+    a0 = aluminium_plate.calculate_dispersion(fd, c_grid, n_workers=1)['antisymmetric'][:, 0]
+    assert np.all(np.diff(a0) > 0)
+    flexural = np.sqrt(np.pi * fd * _plate_velocity(aluminium_plate) / np.sqrt(3))
+    np.testing.assert_allclose(a0, flexural, rtol=1e-2)
+    assert a0[0] < 0.02 * aluminium_plate.vs
+
+
+def test_reference_velocities(aluminium_plate):
+    dispersion = aluminium_plate.calculate_dispersion(np.array([0.5 * MHZ_MM]), n_workers=1)
+    assert dispersion['symmetric'][0, 0] == pytest.approx(5420.0, abs=10.0)
+    assert dispersion['antisymmetric'][0, 0] == pytest.approx(1890.0, abs=10.0)
+
+
+@pytest.mark.parametrize('family', ['symmetric', 'antisymmetric'])
+def test_cutoff_frequencies(aluminium_plate, family):
+    # k = 0 的截止频率：对称模态 fd = n·vs 与 (n + 1/2)·vp，反对称模态 fd = n·vp 与 (n + 1/2)·vs
+    vp, vs = aluminium_plate.vp, aluminium_plate.vs
+    fd_max = 4 * vp
+    if family == 'symmetric':
+        integer, half = vs, vp
+    else:
+        integer, half = vp, vs
+    n = np.arange(1, 20)
+    expected = np.sort(np.concatenate([n * integer, (n - 0.5) * half]))
+    expected = expected[expected < fd_max]
+
+    fd = np.linspace(0.01 * vs, fd_max, 200001)
+    values = lamb_determinant(fd, 1e6 * vp, vp, vs, family)
+    change = np.nonzero(np.signbit(values[:-1]) != np.signbit(values[1:]))[0]
+    np.testing.assert_allclose(fd[change], expected, atol=fd[1] - fd[0])
+
+
+def test_a1_appears_at_its_cutoff(aluminium_plate):
+    cutoff = aluminium_plate.vs / 2
+    c_grid = np.geomspace(0.1 * aluminium_plate.vs, 100 * aluminium_plate.vp, 8192)
+    roots = aluminium_plate.calculate_dispersion(np.array([0.99, 1.01]) * cutoff, c_grid,
+                                                 n_workers=1)['antisymmetric']
+    assert np.isfinite(roots).sum(axis=1).tolist() == [1, 2]
+    assert np.nanmax(roots[1]) > 5 * aluminium_plate.vs
+
+
+def test_incidence_angles_match_critical_angles(materials, aluminium_plate):
+    water = materials['water']
+    critical_p, critical_s = RT_Cal_v2(water, materials['aluminium']).calculate_critical_angles()
+    assert incidence_angles(aluminium_plate.vp, water.vp) == pytest.approx(critical_p)
+    assert incidence_angles(aluminium_plate.vs, water.vp) == pytest.approx(critical_s)
+    assert np.isnan(incidence_angles(0.5 * water.vp, water.vp))
+
+    dispersion = aluminium_plate.calculate_dispersion(np.array([0.5 * MHZ_MM]), n_workers=1)
+    angles = aluminium_plate.calculate_incidence_angles(dispersion, water)
+    assert (angles['critical_p'], angles['critical_s']) == (critical_p, critical_s)
+    np.testing.assert_allclose(angles['symmetric'],
+                               incidence_angles(dispersion['symmetric'], water.vp))
@@ -0,0 +1,63 @@
+import copy
+
+import numpy as np
+import pytest
+
+from Material import Material
+from RT_MonteCarlo import monte_carlo_bands
+from RT_Multilayer import interface_coefficients
+
+ANGLES = np.linspace(0, 89, 30)
+
+
+def _with_tolerances(material):
+    material = copy.copy(material)
+    material.density_sigma = 0.01 * material.density
+    material.vp_sigma = 0.02 * np.real(material.vp)
+    material.vs_sigma = 0.0 if material.is_fluid else 0.02 * np.real(material.vs)
+    return material
+
+
+def _without_tolerances(material):
+    return Material(material.name, material.density, material.vp, material.vs)
+
+
+@pytest.mark.parametrize('name1, name2', [('water', 'aluminium'), ('ice', 'aluminium')])
+def test_material_without_tolerances_gives_zero_spread(materials, name1, name2):
+    material1 = _without_tolerances(materials[name1])
+    material2 = _without_tolerances(materials[name2])
+    bands = monte_carlo_bands(material1, material2, ANGLES, n_samples=500, n_workers=1, seed=0)
+    exact = interface_coefficients(np.deg2rad(ANGLES), material1.density, material1.vp,
+                                   complex(material1.vs), material2.density, material2.vp,
+                                   complex(material2.vs), material1.is_fluid,
+                                   material2.is_fluid)
+    assert bands['n_samples'] == 500
+    for key, value in exact.items():
+        # 确定性结果：所有分位数都等于名义值，离散度为 0
+        np.testing.assert_allclose(bands['bands'][key], np.broadcast_to(value, (3, ANGLES.size)),
+                                   rtol=1e-12, atol=0)
+        np.testing.assert_allclose(bands['mean'][key], value, rtol=1e-12, atol=1e-15)
+        assert np.all(bands['std'][key] == 0)
+        assert np.all(bands['out_of_range'][key] == 0)
+
+
+def test_zero_coefficients_stay_zero(materials):
+    bands = monte_carlo_bands(_with_tolerances(materials['water']),
+                              _with_tolerances(materials['aluminium']), ANGLES,
+                              n_samples=2000, n_workers=1, seed=0)
+    beyond = ANGLES > 35
+    assert np.all(bands['bands']['T_P'][:, beyond] == 0)
+    assert np.all(bands['bands']['T_S'][1:, ANGLES > 60] == 0)
+
+
+def test_out_of_range_values_are_flagged(materials):
+    ice, aluminium = _with_tolerances(materials['ice']), _with_tolerances(materials['aluminium'])
+    full = monte_carlo_bands(ice, aluminium, ANGLES, n_samples=2000, n_workers=1, seed=0)
+    assert all(count.sum() == 0 for count in full['out_of_range'].values())
+    assert np.nanmax(full['bands']['R_P']) <= 1
+
+    narrow = monte_carlo_bands(ice, aluminium, ANGLES, n_samples=2000, n_workers=1, seed=0,
+                               value_range=(0.0, 0.5))
+    flagged = narrow['out_of_range']['R_P'] > 0
+    assert flagged.any()
+    assert np.isnan(narrow['bands']['R_P'][-1, flagged & (full['bands']['R_P'][-1] > 0.5)]).all()
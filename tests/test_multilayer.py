@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from RT_Multilayer import RT_Multilayer, interface_coefficients
+
+FREQUENCIES = np.linspace(0.1e6, 10e6, 40)
+ANGLES = np.linspace(0, 89, 45)
+KEYS = ('R_P', 'R_S', 'T_P', 'T_S')
+
+
+def _stack(materials, top, layers, bottom):
+    return RT_Multilayer(materials[top], [(materials[name], h) for name, h in layers],
+                         materials[bottom])
+
+
+@pytest.mark.parametrize('top, layers, bottom', [
+    ('water', [('ice', 1e-3)], 'aluminium'),
+    ('water', [('ice', 1e-3), ('aluminium', 2e-3), ('ice', 0.5e-3),
+               ('stainless steel347', 1e-3), ('bi sn', 1e-3)], 'aluminium'),
+    ('aluminium', [('water', 0.2e-3), ('lead', 1e-3)], 'hastelloy x'),
+])
+def test_energy_conservation(materials, top, layers, bottom):
+    spectra = _stack(materials, top, layers, bottom).calculate_spectra(FREQUENCIES, ANGLES)
+    total = sum(spectra[key] for key in KEYS)
+    np.testing.assert_allclose(total, 1.0, atol=1e-9)
+
+
+def test_without_layers_matches_single_interface(materials):
+    water, aluminium = materials['water'], materials['aluminium']
+    spectra = _stack(materials, 'water', [], 'aluminium').calculate_spectra(FREQUENCIES, ANGLES)
+    exact = interface_coefficients(np.deg2rad(ANGLES), water.density, water.vp,
+                                   complex(water.vs), aluminium.density, aluminium.vp,
+                                   complex(aluminium.vs), True, False)
+    for key in KEYS:
+        np.testing.assert_allclose(spectra[key], np.broadcast_to(exact[key], spectra[key].shape),
+                                   atol=1e-12)
+
+
+def test_layer_of_incident_medium_changes_nothing(materials):
+    plain = _stack(materials, 'water', [], 'aluminium').calculate_spectra(FREQUENCIES, ANGLES)
+    padded = _stack(materials, 'water', [('water', 3e-3)], 'aluminium').calculate_spectra(
+        FREQUENCIES, ANGLES)
+    for key in KEYS:
+        np.testing.assert_allclose(padded[key], plain[key], atol=1e-10)
+
+
+def test_half_wave_layer_is_transparent(materials):
+    ice, h = materials['ice'], 2e-3
+    frequency = np.real(ice.vp) / (2 * h)
+    spectra = _stack(materials, 'water', [('ice', h)], 'water').calculate_spectra(
+        [frequency], [0.0])
+    assert spectra['T_P'][0, 0] == pytest.approx(1.0, abs=1e-10)
@@ -0,0 +1,16 @@
+import pytest
+
+from RT_Optimize import optimize_catalog, optimize_continuous
+
+
+@pytest.mark.parametrize('objective', ['R_P', 'R_S', 'T_P', 'T_S'])
+def test_continuous_optimum_is_physical(materials, objective):
+    bounds = {'density': (500, 9000), 'vp': (1000, 7000), 'vs': (1000, 3000), 'angle': (0, 90)}
+    result = optimize_continuous(materials['aluminium'], bounds, objective, generations=40,
+                                 seed=1)
+    assert 0 <= result['value'] <= 1 + 1e-9
+
+
+def test_catalog_optimum_is_physical(materials):
+    results = optimize_catalog(materials['aluminium'], list(materials.values()), 'T_S')
+    assert all(0 <= r['value'] <= 1 + 1e-9 for r in results)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from RT_Cal_v2 import COEFFICIENT_KEYS, RT_Cal_v2
+from RT_Pairs import RT_Pairs
+
+ANGLES = np.linspace(0.0, 90.0, 91)
+
+
+def test_pair_tensor_matches_single_pairs(materials):
+    pairs = RT_Pairs(list(materials.values()))
+    tensor = pairs.calculate_intensity_tensor(ANGLES[:-1])
+    for i, material1 in enumerate(pairs.materials):
+        for j, material2 in enumerate(pairs.materials):
+            if i == j:
+                continue
+            coeffs = RT_Cal_v2(material1, material2).calculate_intensity_coef_batch(ANGLES[:-1])
+            expected = np.stack([coeffs[key] for key in COEFFICIENT_KEYS], axis=-1)
+            np.testing.assert_allclose(tensor[i, j], expected, rtol=1e-9, atol=1e-10,
+                                       err_msg=f"{material1.name} -> {material2.name}")
+
+
+def test_tensor_conserves_energy(materials):
+    pairs = RT_Pairs(list(materials.values()))
+    report, violations = pairs.find_energy_violations(pairs.calculate_intensity_tensor(ANGLES),
+                                                      ANGLES, tol=1e-9)
+    assert report['n_violations'] == 0
+    assert all(len(values) == 0 for values in violations.values())
+
+
+def test_critical_angles_match_single_pairs(materials):
+    pairs = RT_Pairs(list(materials.values()))
+    angles = pairs.calculate_critical_angles()
+    assert angles.shape == (len(pairs.materials), len(pairs.materials), 2)
+    for i, material1 in enumerate(pairs.materials):
+        for j, material2 in enumerate(pairs.materials):
+            expected = RT_Cal_v2(material1, material2).calculate_critical_angles()
+            np.testing.assert_allclose(angles[i, j], np.array(expected, dtype=float),
+                                       equal_nan=True,
+                                       err_msg=f"{material1.name} -> {material2.name}")
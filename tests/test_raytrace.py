@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from RT_Cal_v2 import RT_Cal_v2
+from RT_RayTrace import HalfSpace, RT_RayTrace
+
+BOUNDS = ((-0.1, -0.05), (0.1, 0.05))
+SHAPE = (400, 200)
+CELL = 0.5e-3
+HEIGHT = 0.02
+
+
+@pytest.fixture(scope='module')
+def planar(materials):
+    # 水中探头，y < 0 为铝半空间
+    water, aluminium = materials['water'], materials['aluminium']
+    return RT_RayTrace([(HalfSpace((0.0, 0.0), (0.0, 1.0)), aluminium)], water), water, aluminium
+
+
+def _trace(tracer, angle, **kwargs):
+    theta = np.deg2rad(angle)
+    return tracer.trace([(0.0, HEIGHT)], BOUNDS, direction=(np.sin(theta), -np.cos(theta)),
+                        n_rays=1, shape=SHAPE, **kwargs)
+
+
+def test_snell_geometry_and_energy_bookkeeping(planar):
+    tracer, water, aluminium = planar
+    angle = 10.0
+    field, echo, truncated = _trace(tracer, angle)
+    coeffs = RT_Cal_v2(water, aluminium).calculate_intensity_coef(angle)
+    assert truncated[0] == 0.0 and echo[0] == 0.0
+
+    # 透射 P、S 波按 Snell 定律折射：在 y = -20 mm 的像素行中定位
+    sin_in = np.sin(np.deg2rad(angle))
+    x0 = HEIGHT * np.tan(np.deg2rad(angle))
+    row = int(round((-0.02 - BOUNDS[0][1]) / CELL))
+    depth = -(BOUNDS[0][1] + (row + 0.5) * CELL)
+    hit = np.nonzero(field[:, row])[0]
+    expected = []
+    for c in (aluminium.vs, aluminium.vp):
+        theta_out = np.arcsin(sin_in * c / water.vp)
+        expected.append((x0 + depth * np.tan(theta_out) - BOUNDS[0][0]) / CELL)
+    assert len(hit) == 2
+    np.testing.assert_allclose(hit, expected, atol=1.0)
+
+    # E·ds 的总和 = 各段能量 × 路程（无衰减）
+    cos_in = np.cos(np.deg2rad(angle))
+    above = (HEIGHT + coeffs['R_P'] * BOUNDS[1][1]) / cos_in
+    below = 0.0
+    for key, c in (('T_P', aluminium.vp), ('T_S', aluminium.vs)):
+        theta_out = np.arcsin(sin_in * c / water.vp)
+        length = min(-BOUNDS[0][1] / np.cos(theta_out),
+                     (BOUNDS[1][0] - x0) / np.sin(theta_out))
+        below += coeffs[key] * length
+    half = SHAPE[1] // 2
+    assert field[:, half:].sum() == pytest.approx(above, rel=1e-4)
+    assert field[:, :half].sum() == pytest.approx(below, rel=1e-4)
+
+
+def test_normal_incidence_echo(planar):
+    tracer, water, aluminium = planar
+    _, echo, truncated = _trace(tracer, 0.0)
+    coeffs = RT_Cal_v2(water, aluminium).calculate_intensity_coef(0.0)
+    assert echo[0] == pytest.approx(coeffs['R_P'], rel=1e-6)
+    assert truncated[0] == 0.0
+
+
+def test_max_events_keeps_truncated_energy(planar):
+    tracer, _, _ = planar
+    field, echo, truncated = _trace(tracer, 0.0, max_events=0)
+    assert echo[0] == 0.0
+    assert truncated[0] == pytest.approx(1.0)
+    assert field[:, :SHAPE[1] // 2].sum() == 0.0
+
+
+def test_simulate_reports_truncated(planar):
+    tracer, _, _ = planar
+    result = tracer.simulate([(0.0, HEIGHT), (0.01, HEIGHT)], BOUNDS, n_rays=4, shape=None,
+                             max_events=0, n_workers=1)
+    np.testing.assert_allclose(result['truncated'], 1.0)
+    assert result['map'] is None
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from RT_Roots import characteristic_roots
+
+
+def _roots(material1, material2):
+    return characteristic_roots(material1.density, material1.vp, complex(material1.vs),
+                                material2.density, material2.vp, complex(material2.vs),
+                                material1.is_fluid, material2.is_fluid)
+
+
+@pytest.mark.parametrize('name1, name2, velocity', [
+    ('stainless steel347', 'aluminium', 3068.1),
+    ('ice', 'bi sn', 1366.1),
+    ('hastelloy x', 'al ice composite', 2683.4),
+])
+def test_stoneley_velocity_independent_of_order(materials, name1, name2, velocity):
+    forward = _roots(materials[name1], materials[name2])['interface_velocity']
+    reverse = _roots(materials[name2], materials[name1])['interface_velocity']
+    assert forward == pytest.approx(velocity, abs=0.1)
+    assert reverse == pytest.approx(float(forward), rel=1e-9)
+
+
+def test_fluid_solid_roots(materials):
+    roots = _roots(materials['water'], materials['aluminium'])
+    assert roots['rayleigh'] == pytest.approx(30.2, abs=0.1)
+    assert roots['interface_velocity'] == pytest.approx(1477.0, abs=2.0)
+
+
+def test_no_spurious_solid_solid_rayleigh(materials):
+    for name in ('bi sn', 'lead'):
+        assert np.isnan(_roots(materials[name], materials['aluminium'])['rayleigh'])
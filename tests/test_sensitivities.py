@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from RT_Cal_v2 import PARAMETER_KEYS, intensity_coefficients, intensity_sensitivities
+from RT_Multilayer import interface_coefficients, interface_sensitivities
+
+KEYS = ('R_P', 'R_S', 'T_P', 'T_S')
+STEP = 1e-6
+
+
+def _params(material1, material2):
+    return [material1.density, float(np.real(material1.vp)), float(np.real(material1.vs)),
+            material2.density, float(np.real(material2.vp)), float(np.real(material2.vs))]
+
+
+def _smooth_angles(params, count=40):
+    # 临界角附近系数不可导，只在远离临界角处比较
+    _, cP1, _, _, cP2, cS2 = params
+    critical = [np.degrees(np.arcsin(cP1 / c)) for c in (cP2, cS2) if c > cP1]
+    angles = np.linspace(1.0, 85.0, count)
+    keep = np.all([np.abs(angles - c) > 2.0 for c in critical], axis=0)
+    return np.deg2rad(angles[keep])
+
+
+def _finite_differences(coefficients, theta, params):
+    derivatives = {key: np.empty(theta.shape + (len(params),)) for key in KEYS}
+    for i, value in enumerate(params):
+        h = STEP * value
+        plus, minus = list(params), list(params)
+        plus[i], minus[i] = value + h, value - h
+        upper, lower = coefficients(theta, plus), coefficients(theta, minus)
+        for key in KEYS:
+            derivatives[key][..., i] = (upper[key] - lower[key]) / (2 * h)
+    return derivatives
+
+
+def _assert_matches(analytic, numeric, params):
+    # 导数乘以参数本身后比较（量纲一致）
+    scale = np.asarray(params, dtype=float)
+    for key in KEYS:
+        np.testing.assert_allclose(analytic[key] * scale, numeric[key] * scale,
+                                   rtol=1e-5, atol=1e-7, err_msg=key)
+
+
+@pytest.mark.parametrize('name1, name2', [('aluminium', 'stainless steel347'),
+                                          ('ice', 'aluminium'), ('aluminium', 'ice'),
+                                          ('bi sn', 'hastelloy x')])
+def test_solid_sensitivities_match_finite_differences(materials, name1, name2):
+    params = _params(materials[name1], materials[name2])
+    theta = _smooth_angles(params)
+
+    def coefficients(theta, p):
+        return intensity_coefficients(theta, p[0], p[1], p[2] + 0j, p[3], p[4], p[5] + 0j)
+
+    def reference(theta, p):
+        # 位移/应力方程组作为独立参照
+        return interface_coefficients(theta, p[0], p[1], p[2] + 0j, p[3], p[4], p[5] + 0j,
+                                      False, False)
+
+    coeffs, sensitivities = intensity_sensitivities(theta, *params[:2], params[2] + 0j,
+                                                    *params[3:5], params[5] + 0j)
+    assert all(s.shape == theta.shape + (len(PARAMETER_KEYS),) for s in sensitivities.values())
+    exact = reference(theta, params)
+    for key in KEYS:
+        np.testing.assert_allclose(coeffs[key], exact[key], atol=1e-10, err_msg=key)
+    _assert_matches(sensitivities, _finite_differences(coefficients, theta, params), params)
+    _assert_matches(sensitivities, _finite_differences(reference, theta, params), params)
+    # 能量守恒：各系数之和恒为 1，导数之和为 0
+    total = sum(sensitivities[key] for key in KEYS) * np.asarray(params, dtype=float)
+    np.testing.assert_allclose(total, 0.0, atol=1e-9)
+
+
+@pytest.mark.parametrize('name1, name2', [('water', 'aluminium'), ('aluminium', 'water'),
+                                          ('water', 'wax'), ('wax', 'water')])
+def test_fluid_sensitivities_match_finite_differences(materials, name1, name2):
+    fluid = (materials[name1].is_fluid, materials[name2].is_fluid)
+    params = _params(materials[name1], materials[name2])
+    theta = _smooth_angles(params)
+
+    def coefficients(theta, p):
+        return interface_coefficients(theta, p[0], p[1], p[2] + 0j, p[3], p[4],
+                                      p[5] + 0j, *fluid)
+
+    coeffs, sensitivities = interface_sensitivities(
+        theta, *params[:2], params[2] + 0j, *params[3:5], params[5] + 0j, *fluid)
+    exact = coefficients(theta, params)
+    for key in KEYS:
+        np.testing.assert_allclose(coeffs[key], exact[key], atol=1e-12)
+    _assert_matches(sensitivities, _finite_differences(coefficients, theta, params), params)
+    total = sum(sensitivities[key] for key in KEYS) * np.asarray(params, dtype=float)
+    np.testing.assert_allclose(total, 0.0, atol=1e-9)
+    # 流体一侧的横波速度不是参数，导数为 0
+    for side, is_fluid in enumerate(fluid):
+        if is_fluid:
+            assert all(np.all(s[..., 3 * side + 2] == 0) for s in sensitivities.values())
@@ -0,0 +1,42 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from RT_Cal_v2 import RT_Cal_v2, intensity_coefficients
+from RT_Multilayer import interface_coefficients
+
+ANGLES = np.linspace(0.0, 89.9, 300)
+KEYS = ('R_P', 'R_S', 'T_P', 'T_S')
+
+
+def _solid_pairs(materials):
+    solids = [material for material in materials.values() if not material.is_fluid]
+    return list(itertools.permutations(solids, 2))
+
+
+@pytest.mark.parametrize('backend', ['solve', 'cramer'])
+def test_solid_solid_energy_conservation(materials, backend):
+    for material1, material2 in _solid_pairs(materials):
+        coeffs = RT_Cal_v2(material1, material2).calculate_intensity_coef_batch(ANGLES, backend)
+        np.testing.assert_allclose(sum(coeffs[key] for key in KEYS), 1.0, atol=1e-10,
+                                   err_msg=f"{material1.name} -> {material2.name}")
+
+
+def test_angle_kernel_matches_displacement_stress_kernel(materials):
+    theta = np.deg2rad(ANGLES)
+    for material1, material2 in _solid_pairs(materials):
+        params = (material1.density, material1.vp, complex(material1.vs),
+                  material2.density, material2.vp, complex(material2.vs))
+        angle_based = intensity_coefficients(theta, *params)
+        general = interface_coefficients(theta, *params, False, False)
+        for key in KEYS:
+            np.testing.assert_allclose(angle_based[key], general[key], atol=1e-10,
+                                       err_msg=f"{material1.name} -> {material2.name} {key}")
+
+
+def test_ice_aluminium_intensity_coef(materials):
+    rt = RT_Cal_v2(materials['ice'], materials['aluminium'])
+    for angle in (5.0, 20.0, 40.0):
+        coeffs = rt.calculate_intensity_coef(angle)
+        assert sum(coeffs[key] for key in KEYS) == pytest.approx(1.0, abs=1e-12)
@@ -0,0 +1,13 @@
+import numpy as np
+
+from RT_Sweep import RT_Sweep
+
+
+def test_sweep_peaks_conserve_energy(materials, tmp_path):
+    sweep = RT_Sweep.run(materials['aluminium'], np.linspace(500, 9000, 8),
+                         np.linspace(1000, 7000, 8), np.linspace(0, 4000, 8),
+                         np.linspace(0, 90, 46), tmp_path, n_workers=1)
+    peak = np.asarray(sweep.peak)
+    assert np.nanmax(peak) <= 1 + 1e-6
+    for optimum in sweep.optima(keys=('R_P', 'R_S', 'T_P', 'T_S')).values():
+        assert optimum['value'] <= 1 + 1e-6
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from RT_Cal_v2 import RT_Cal_v2
+from RT_Surface import RT_Surface
+from RT_Table import RT_Table
+
+ANGLES = np.linspace(0.0, 90.0, 2001)
+
+
+@pytest.fixture
+def saved(materials, tmp_path):
+    rt_cal = RT_Cal_v2(materials['water'], materials['aluminium'])
+    table = RT_Table.build(rt_cal)
+    path = tmp_path / 'water_aluminium.npz'
+    table.save(path)
+    return rt_cal, table, path
+
+
+def test_round_trip_is_exact(saved):
+    rt_cal, table, path = saved
+    loaded = RT_Table.load(path, rt_cal)
+    assert loaded.values.dtype == np.float64
+    expected = table.calculate_intensity_coef_batch(ANGLES)
+    for key, value in loaded.calculate_intensity_coef_batch(ANGLES).items():
+        assert np.array_equal(value, expected[key])
+    assert loaded.calculate_critical_angles() == table.calculate_critical_angles()
+
+
+def test_interpolation_error(saved):
+    rt_cal, table, _ = saved
+    exact = rt_cal.calculate_intensity_coef_batch(ANGLES)
+    interpolated = table.calculate_intensity_coef_batch(ANGLES)
+    for key in exact:
+        np.testing.assert_allclose(interpolated[key], exact[key], atol=4e-3)
+
+
+def test_load_rejects_other_pair(saved, materials):
+    _, _, path = saved
+    with pytest.raises(ValueError):
+        RT_Table.load(path, RT_Cal_v2(materials['water'], materials['stainless steel347']))
+    with pytest.raises(ValueError):
+        RT_Surface(materials['water'], materials['ice'], table=RT_Table.load(path))
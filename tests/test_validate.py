@@ -0,0 +1,41 @@
+import numpy as np
+
+from RT_Pairs import RT_Pairs
+from RT_Validate import validate_energy
+
+ANGLES = np.linspace(0.0, 90.0, 31)
+
+
+def test_validate_energy_flags_residuals_and_nan():
+    tensor = np.full((2, 3, 4), 0.25)
+    tensor[0, 1] = [0.5, 0.5, 0.5, 0.0]
+    tensor[1, 2, 0] = np.nan
+    report = validate_energy(tensor, tol=1e-6)
+    assert report['n_violations'] == 2
+    assert report['indices'].tolist() == [[0, 1], [1, 2]]
+    assert report['max_residual'] == 0.5
+
+
+def test_violations_sorted_and_mapped(materials):
+    pairs = RT_Pairs(list(materials.values()))
+    tensor = pairs.calculate_intensity_tensor(ANGLES)
+    tensor[0, 1, 2, 0] = np.nan
+    report, violations = pairs.find_energy_violations(tensor, ANGLES)
+
+    assert len(violations['residual']) == report['n_violations']
+    assert np.isnan(violations['residual'][0])
+    assert (violations['material1'][0], violations['material2'][0]) == (0, 1)
+    assert violations['angle'][0] == ANGLES[2]
+    severity = np.abs(violations['residual'][1:])
+    assert np.all(np.diff(severity) <= 0)
+    k = np.searchsorted(ANGLES, violations['angle'])
+    np.testing.assert_array_equal(
+        report['residual'][violations['material1'], violations['material2'], k],
+        violations['residual'])
+
+
+def test_fluid_pairs_conserve_energy(materials):
+    pairs = RT_Pairs(list(materials.values()))
+    _, violations = pairs.find_energy_violations(pairs.calculate_intensity_tensor(ANGLES), ANGLES)
+    fluid = np.array([materials[name].is_fluid for name in pairs.names])
+    assert not np.any(fluid[violations['material1']] | fluid[violations['material2']])